@@ -9,7 +9,7 @@ Komutlar:
 - .günlük, .haftalık, .aylık - Sıralamalar (grup - admin)
 - roll X - Roll başlat (grup - admin)
 - liste - Roll listesi (grup - admin)
-- /etiket [mesaj] - 5'erli toplu etiketleme (grup - admin)
+- /etiket [mesaj] - Toplu etiketleme (grup - admin)
 - /naber - Tek tek rastgele mesajlarla etiketleme (grup - admin)
 - /dur - Aktif etiketlemeyi durdur (grup - admin)
 """
@@ -22,11 +22,12 @@ from telegram.ext import (
     CommandHandler,
     MessageHandler,
     CallbackQueryHandler,
+    ChatMemberHandler,
     filters,
     ContextTypes
 )
 
-from config import BOT_TOKEN
+from config import BOT_TOKEN, UPDATE_CONCURRENCY
 from database import db
 from handlers.commands import (
     start_command,
@@ -43,6 +44,15 @@ from handlers.commands import (
 )
 from handlers.messages import handle_message
 from handlers.callbacks import handle_callback
+from handlers.chat_members import handle_chat_member, handle_my_chat_member, handle_chat_title
+from handlers.jobs import schedule_jobs
+from utils.chat_info import warm_chat_info
+from utils.rate_limiter import OutboundRateLimiter
+from utils.update_processor import UserOrderedUpdateProcessor
+from services.message_service import flush_message_buffer, flush_activity_buffer
+from services.roll_service import flush_roll_activity
+from services.randy_service import flush_post_randy_counts
+from services.tagging_service import resume_tagging_jobs, shutdown_tagging
 
 # Logging ayarları
 logging.basicConfig(
@@ -60,11 +70,24 @@ logging.getLogger("telegram.ext").setLevel(logging.WARNING)
 async def post_init(application: Application) -> None:
     """Bot başladığında veritabanı bağlantısını kur"""
     await db.connect()
+    await warm_chat_info(application.bot)
+    schedule_jobs(application)
+    # Yeniden başlatmadan önce yarım kalan etiketlemeleri devam ettir
+    await resume_tagging_jobs(application.bot)
     logger.info("✅ Bot başlatıldı!")
 
 
+async def post_stop(application: Application) -> None:
+    """Bot durunca (HTTP istemcisi kapanmadan önce) etiketleme task'larını bırak"""
+    await shutdown_tagging()
+
+
 async def post_shutdown(application: Application) -> None:
-    """Bot kapanırken veritabanı bağlantısını kapat"""
+    """Bot kapanırken bekleyen yazmaları bitir ve veritabanı bağlantısını kapat"""
+    await flush_message_buffer()
+    await flush_activity_buffer()
+    await flush_roll_activity()
+    await flush_post_randy_counts()
     await db.close()
     logger.info("🔌 Bot kapatıldı")
 
@@ -79,7 +102,11 @@ def main():
     application = (
         Application.builder()
         .token(BOT_TOKEN)
+        .rate_limiter(OutboundRateLimiter())
+        # Sınıra takılan bir sohbet diğer sohbetlerin güncellemelerini bekletmesin
+        .concurrent_updates(UserOrderedUpdateProcessor(UPDATE_CONCURRENCY))
         .post_init(post_init)
+        .post_stop(post_stop)
         .post_shutdown(post_shutdown)
         .build()
     )
@@ -135,6 +162,14 @@ def main():
     # ========== CALLBACK HANDLER ==========
     application.add_handler(CallbackQueryHandler(handle_callback))
 
+    # ========== ÜYELİK HANDLER ==========
+    # Kanal/grup üyelik değişiklikleri (üyelik cache'i için)
+    application.add_handler(ChatMemberHandler(handle_chat_member, ChatMemberHandler.CHAT_MEMBER))
+
+    # Botun yetki değişiklikleri ve başlık değişiklikleri (sohbet bilgisi cache'i için)
+    application.add_handler(ChatMemberHandler(handle_my_chat_member, ChatMemberHandler.MY_CHAT_MEMBER))
+    application.add_handler(MessageHandler(filters.StatusUpdate.NEW_CHAT_TITLE, handle_chat_title))
+
     # ========== MESAJ HANDLER ==========
     # Roll komutları + Mesaj sayma (grup) + Randy ayarları (özel)
     # Tüm mesaj tiplerini yakala (TEXT, PHOTO, VIDEO, STICKER vs.)
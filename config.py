@@ -22,7 +22,33 @@ ACTIVITY_GROUP_ID = int(os.getenv("ACTIVITY_GROUP_ID", "0"))
 
 # ========== CACHE AYARLARI ==========
 ADMIN_CACHE_TTL = 300  # 5 dakika (saniye)
-CLEANUP_THROTTLE_MS = 30000  # 30 saniye (milisaniye)
+ADMIN_CACHE_MAX_SIZE = 10000  # en fazla (grup, kullanıcı) kaydı
+ADMIN_ROSTER_TTL = 600  # 10 dakika (saniye) - grup admin listesi
+ADMIN_ROSTER_FAILURE_TTL = 60  # saniye - admin listesi alınamazsa tekrar denemeden önce
+ADMIN_SYNC_INTERVAL = 900  # 15 dakika (saniye) - group_admins tablosu senkronizasyonu
+ADMIN_SYNC_CONCURRENCY = 5  # aynı anda en fazla get_chat_administrators çağrısı
+CHAT_INFO_CACHE_TTL = 21600  # 6 saat (saniye) - başlık/username/davet linki
+CLEANUP_THROTTLE_MS = 30000  # İnaktif kullanıcı tahliye aralığı - 30 saniye (milisaniye)
+
+# ========== KANAL ÜYELİK KONTROLÜ ==========
+# Randy katılımında zorunlu kanallar eşzamanlı kontrol edilir
+CHANNEL_CHECK_CONCURRENCY = 10  # aynı anda en fazla get_chat_member çağrısı
+CHANNEL_CHECK_TIMEOUT = 3  # saniye - kanal başına
+CHANNEL_CHECK_FAIL_OPEN = True  # True: kontrol edilemeyen kanal geçilir, False: üye değil sayılır
+MEMBERSHIP_CACHE_MAX_SIZE = 20000  # en fazla (kanal, kullanıcı) kaydı
+MEMBERSHIP_CACHE_POSITIVE_TTL = 600  # saniye - üye sonucu
+MEMBERSHIP_CACHE_NEGATIVE_TTL = 20  # saniye - üye değil sonucu (kullanıcı kanala katılıp tekrar dener)
+
+# ========== GİDEN MESAJ SINIRI ==========
+# Telegram flood limitleri (tüm gönderimler utils/rate_limiter.py üzerinden geçer)
+RATE_LIMIT_GLOBAL_PER_SECOND = 30  # tüm sohbetler toplamı
+RATE_LIMIT_GROUP_PER_MINUTE = 20  # grup/kanal başına
+RATE_LIMIT_PRIVATE_PER_SECOND = 1  # özel sohbet başına
+RATE_LIMIT_MAX_RETRIES = 2  # RetryAfter sonrası tekrar deneme sayısı (etkileşimli istekler)
+
+# ========== GÜNCELLEME İŞLEME ==========
+# Güncellemeler eşzamanlı işlenir; aynı sohbetteki aynı kullanıcının güncellemeleri sırayla (utils/update_processor.py)
+UPDATE_CONCURRENCY = 64  # aynı anda işlenen en fazla güncelleme
 
 # ========== MESAJ SAYMA ==========
 # Bu ID'lerden gelen mesajlar sayılmaz
@@ -31,18 +57,47 @@ IGNORED_USER_IDS = [
     1087968824,  # GroupAnonymousBot (anonim adminler)
 ]
 
+# ========== MESAJ TAMPONU ==========
+# Mesaj sayaçları bellekte toplanır ve toplu olarak yazılır
+MESSAGE_FLUSH_INTERVAL = 5  # saniye (0 = tampon kapalı, her mesaj tek sorguda yazılır)
+MESSAGE_FLUSH_MAX_PENDING = 500  # bu kadar (kullanıcı, grup) birikince beklemeden yaz
+
+# ========== MESAJ AKTİVİTESİ ==========
+# Saatlik mesaj kovaları (keyfi zaman aralığı sorguları için)
+ACTIVITY_FLUSH_INTERVAL = 10  # saniye
+ACTIVITY_HOURLY_RETENTION_DAYS = 14  # bundan eski saatler günlük kovalara sıkıştırılır
+
 # ========== ROLL VARSAYILANLARI ==========
 DEFAULT_ROLL_DURATION = 2  # dakika
+ROLL_FLUSH_INTERVAL = 1  # saniye - roll aktivitesi bu aralıkla toplu yazılır
 
 # ========== RANDY VARSAYILANLARI ==========
 DEFAULT_WINNER_COUNT = 1
+RANDY_EDIT_INTERVAL = 3  # saniye - katılımlarda Randy mesajı en fazla bu aralıkla düzenlenir
+POST_RANDY_FLUSH_INTERVAL = 2  # saniye - Randy sonrası mesaj sayıları bu aralıkla toplu yazılır
+
+# ========== ETİKETLEME ==========
+# Gönderim aralığı flood cevaplarına göre uyarlanır (services/tagging_service.py)
+TAGGING_MIN_INTERVAL = 3.0  # saniye - grup limiti (20/dk) ile uyumlu en kısa aralık
+TAGGING_MAX_INTERVAL = 60.0  # saniye - art arda flood sonrası aralık üst sınırı
+TAGGING_INTERVAL_STEP = 0.25  # saniye - her başarılı gönderimde aralık bu kadar kısalır
+TAGGING_PROGRESS_INTERVAL = 30  # saniye - ilerleme mesajı en fazla bu aralıkla düzenlenir
+TAGGING_MAX_SEND_ATTEMPTS = 5  # ağ hatalarında aynı mesaj için deneme sayısı
+TAGGING_PAGE_SIZE = 200  # kullanıcılar veritabanından bu boyutta sayfalarla okunur
+TAGGING_JOB_HEARTBEAT_INTERVAL = 30  # saniye - çalışan işlerin heartbeat'i / yarım işlerin kontrolü
+TAGGING_JOB_STALE_AFTER = 120  # saniye - heartbeat'i bu kadar eski iş başka süreçte devralınır
+ETIKET_MAX_MENTIONS = 100  # Telegram mesaj başına en fazla 100 entity işler
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096  # UTF-16 birimi, entity ayrıştırması sonrası
 
 # ========== MESAJ ŞARTI TİPLERİ ==========
+REQUIREMENT_RECENT_HOURS = 72  # "recent" şartının kayan pencere uzunluğu (saat)
+
 REQUIREMENT_TYPES = {
     "none": "Şartsız",
     "daily": "Günlük Mesaj",
     "weekly": "Haftalık Mesaj",
     "monthly": "Aylık Mesaj",
+    "recent": f"Son {REQUIREMENT_RECENT_HOURS} Saat Mesaj",
     "all_time": "Toplam Mesaj",
     "post_randy": "Randy Sonrası Mesaj"
 }
@@ -99,6 +99,8 @@ class Database:
                     status TEXT DEFAULT 'draft',
                     message_id BIGINT,
                     pin_message BOOLEAN DEFAULT FALSE,
+                    participant_count INT NOT NULL DEFAULT 0,
+                    draw_seed TEXT,
                     started_at TIMESTAMP,
                     ended_at TIMESTAMP,
                     created_at TIMESTAMP DEFAULT NOW()
@@ -206,14 +208,78 @@ class Database:
                 )
             """)
 
+            # Saatlik Mesaj Aktivitesi (eski saatler günlük kovalara sıkıştırılır)
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS message_activity (
+                    group_id BIGINT NOT NULL,
+                    user_id BIGINT NOT NULL,
+                    bucket TIMESTAMP NOT NULL,
+                    message_count INT NOT NULL DEFAULT 0,
+                    PRIMARY KEY (group_id, user_id, bucket) INCLUDE (message_count)
+                )
+            """)
+
+            # Etiketleme İşleri (/etiket, /naber - yeniden başlatmada devam eder)
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS tagging_jobs (
+                    id SERIAL PRIMARY KEY,
+                    group_id BIGINT NOT NULL,
+                    job_type TEXT NOT NULL,
+                    message TEXT,
+                    status TEXT DEFAULT 'running',
+                    cursor_telegram_id BIGINT,
+                    done_count INT DEFAULT 0,
+                    skipped_count INT DEFAULT 0,
+                    total_count INT DEFAULT 0,
+                    progress_message_id BIGINT,
+                    heartbeat_at TIMESTAMP,
+                    created_at TIMESTAMP DEFAULT NOW(),
+                    updated_at TIMESTAMP DEFAULT NOW()
+                )
+            """)
+
+            # Şema güncellemeleri (mevcut veritabanları için)
+            has_participant_count = await conn.fetchval("""
+                SELECT EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = 'randy' AND column_name = 'participant_count'
+                )
+            """)
+            if not has_participant_count:
+                await conn.execute("ALTER TABLE randy ADD COLUMN participant_count INT NOT NULL DEFAULT 0")
+                # Mevcut Randy'lerin katılımcı sayılarını bir kereye mahsus hesapla
+                await conn.execute("""
+                    UPDATE randy r SET participant_count = p.cnt
+                    FROM (
+                        SELECT randy_id, COUNT(*) AS cnt FROM randy_participants
+                        WHERE username IS NOT NULL OR first_name IS NOT NULL
+                        GROUP BY randy_id
+                    ) p
+                    WHERE p.randy_id = r.id
+                """)
+
+            has_draw_seed = await conn.fetchval("""
+                SELECT EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = 'randy' AND column_name = 'draw_seed'
+                )
+            """)
+            if not has_draw_seed:
+                await conn.execute("ALTER TABLE randy ADD COLUMN draw_seed TEXT")
+
             # İndeksler
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_users_telegram ON telegram_users(telegram_id)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_users_group ON telegram_users(group_id)")
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_users_group_telegram ON telegram_users(group_id, telegram_id)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_randy_status ON randy(status)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_randy_group ON randy(group_id)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_roll_group ON roll_sessions(group_id)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_randy_channels_draft ON randy_channels(randy_draft_id)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_randy_channels_randy ON randy_channels(randy_id)")
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_group_admins_user ON group_admins(user_id) WHERE is_admin = TRUE")
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_activity_group_bucket ON message_activity(group_id, bucket) INCLUDE (user_id, message_count)")
+            # Grup başına tek çalışan etiketleme işi (süreçler arası kilit)
+            await conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_tagging_jobs_running ON tagging_jobs(group_id) WHERE status = 'running'")
 
             print("✅ Tablolar oluşturuldu")
 
@@ -5,7 +5,6 @@ Buton tıklamalarını yönetir
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from telegram.error import TelegramError
 
 from templates import (
     MENU, RANDY, BUTTONS, ERRORS, SUCCESS,
@@ -13,13 +12,14 @@ from templates import (
 )
 from services.randy_service import (
     get_draft, update_draft,
-    get_user_admin_groups, join_randy, get_participant_count,
-    get_randy_by_id, end_randy,
+    get_user_admin_groups, join_randy, end_randy,
     add_channel_to_draft, remove_channel_from_draft,
     get_draft_channels, clear_draft_channels,
     get_or_create_group_draft
 )
+from services.randy_announcement import schedule_announcement_edit
 from utils.admin_check import is_group_admin, is_activity_group_admin
+from utils.chat_info import get_chat_info
 
 
 async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -160,7 +160,7 @@ async def start_randy_creation(query, user_id: int, context: ContextTypes.DEFAUL
     if not groups and ACTIVITY_GROUP_ID and ACTIVITY_GROUP_ID != 0:
         try:
             # Grup bilgisini Telegram'dan al
-            chat = await context.bot.get_chat(ACTIVITY_GROUP_ID)
+            chat = await get_chat_info(context.bot, ACTIVITY_GROUP_ID)
             from services.randy_service import register_group, update_group_admin
             await register_group(ACTIVITY_GROUP_ID, chat.title)
             await update_group_admin(ACTIVITY_GROUP_ID, user_id, True)
@@ -372,6 +372,7 @@ async def show_requirement_menu(query):
         [InlineKeyboardButton(BUTTONS["GUNLUK_MESAJ"], callback_data="randy_req_daily")],
         [InlineKeyboardButton(BUTTONS["HAFTALIK_MESAJ"], callback_data="randy_req_weekly")],
         [InlineKeyboardButton(BUTTONS["AYLIK_MESAJ"], callback_data="randy_req_monthly")],
+        [InlineKeyboardButton(BUTTONS["SON_SAATLER"], callback_data="randy_req_recent")],
         [InlineKeyboardButton(BUTTONS["TOPLAM_MESAJ"], callback_data="randy_req_all_time")],
         [InlineKeyboardButton(BUTTONS["RANDY_SONRASI"], callback_data="randy_req_post_randy")],
         [InlineKeyboardButton(BUTTONS["GERI"], callback_data="randy_back")],
@@ -678,9 +679,6 @@ async def go_back(query, user_id: int, context: ContextTypes.DEFAULT_TYPE):
 
 async def handle_randy_join(query, user_id: int, randy_id: int, context: ContextTypes.DEFAULT_TYPE):
     """Randy'ye katılım"""
-    from services.randy_service import get_randy_channels
-    from config import ACTIVITY_GROUP_ID
-
     username = query.from_user.username
     first_name = query.from_user.first_name
 
@@ -690,85 +688,12 @@ async def handle_randy_join(query, user_id: int, randy_id: int, context: Context
     if success:
         await query.answer(RANDY["BASARIYLA_KATILDIN"], show_alert=True)
 
-        # Katılımcı sayısını güncelle
-        count = await get_participant_count(randy_id)
-        randy = await get_randy_by_id(randy_id)
-
-        if randy:
-            # Zorunlu kanalları al (activity dahil)
-            channels_list = []
-
-            # Activity group'u ekle
-            if ACTIVITY_GROUP_ID and ACTIVITY_GROUP_ID != 0:
-                try:
-                    activity_chat = await context.bot.get_chat(ACTIVITY_GROUP_ID)
-                    if activity_chat.username:
-                        channels_list.append(f'<a href="https://t.me/{activity_chat.username}">{activity_chat.title or activity_chat.username}</a>')
-                    elif activity_chat.title:
-                        channels_list.append(activity_chat.title)
-                except:
-                    pass
-
-            # Eklenen zorunlu kanalları al
-            randy_channels = await get_randy_channels(randy_id)
-            for ch in randy_channels:
-                if ch.get('channel_username'):
-                    title = ch.get('channel_title') or ch['channel_username']
-                    channels_list.append(f'<a href="https://t.me/{ch["channel_username"]}">{title}</a>')
-                elif ch.get('channel_title'):
-                    channels_list.append(ch['channel_title'])
-
-            # Kanal metni oluştur (alt alta)
-            if channels_list:
-                channels_text = "📢 <b>Zorunlu:</b>\n" + "\n".join(channels_list) + "\n\n"
-            else:
-                channels_text = ""
-
-            # Şart varsa şartlı template kullan
-            req_type = randy.get('requirement_type', 'none')
-            req_count = randy.get('required_message_count', 0)
-
-            if req_type != 'none' and req_count > 0:
-                period_text = get_period_text(req_type)
-                requirement = f"{period_text} {req_count} mesaj"
-                new_text = RANDY["BASLADI_SARTLI"].format(
-                    message=randy['message'],
-                    requirement=requirement,
-                    channels_text=channels_text,
-                    participants=count,
-                    winners=randy['winner_count']
-                )
-            else:
-                new_text = RANDY["BASLADI"].format(
-                    message=randy['message'],
-                    channels_text=channels_text,
-                    participants=count,
-                    winners=randy['winner_count']
-                )
-
-            keyboard = [[
-                InlineKeyboardButton(
-                    f"🎉 Katıl ({count})",
-                    callback_data=f"randy_join_{randy_id}"
-                )
-            ]]
-
-            try:
-                # Medya varsa caption güncelle, yoksa text güncelle
-                if randy.get('media_file_id') and randy.get('media_type') != 'none':
-                    await query.edit_message_caption(
-                        caption=new_text,
-                        reply_markup=InlineKeyboardMarkup(keyboard),
-                        parse_mode="HTML"
-                    )
-                else:
-                    await query.edit_message_text(
-                        new_text,
-                        reply_markup=InlineKeyboardMarkup(keyboard),
-                        parse_mode="HTML"
-                    )
-            except TelegramError:
-                pass
+        # Randy mesajını güncelle - art arda katılımlar tek düzenlemede birleştirilir
+        if query.message:
+            schedule_announcement_edit(
+                context.bot, randy_id,
+                query.message.chat_id, query.message.message_id
+            )
 
     elif code == "zaten_katildi":
         await query.answer(RANDY["ZATEN_KATILDIN"], show_alert=True)
@@ -0,0 +1,58 @@
+"""
+👥 Üyelik Güncellemeleri
+chat_member / my_chat_member güncellemeleri ile cache'lerin güncel tutulması
+"""
+
+from telegram import Update, ChatMember
+from telegram.ext import ContextTypes
+
+from utils.member_check import set_cached_membership
+from utils.chat_info import clear_chat_info
+from utils.admin_check import update_admin_roster, clear_admin_roster
+
+
+async def handle_chat_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Kanal/grup üyelik değişikliklerini işle
+    (Telegram bu güncellemeleri sadece botun admin olduğu sohbetler için gönderir)
+    """
+    member_update = update.chat_member
+    if not member_update:
+        return
+
+    chat_id = member_update.chat.id
+    new_member = member_update.new_chat_member
+
+    is_member = new_member.status not in [ChatMember.LEFT, ChatMember.BANNED]
+    set_cached_membership(chat_id, new_member.user.id, is_member)
+
+    # Admin yetkisi değiştiyse admin listesini güncelle
+    admin_statuses = [ChatMember.ADMINISTRATOR, ChatMember.OWNER]
+    was_admin = member_update.old_chat_member.status in admin_statuses
+    is_admin = new_member.status in admin_statuses
+
+    if was_admin != is_admin:
+        update_admin_roster(chat_id, new_member.user.id, is_admin)
+
+
+async def handle_my_chat_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Botun kendi üyelik/yetki değişikliklerini işle
+    (Yetki değişince davet linki vb. değişebilir - sohbet bilgisi yeniden alınır)
+    """
+    member_update = update.my_chat_member
+    if not member_update:
+        return
+
+    clear_chat_info(member_update.chat.id)
+    # Bot yetkisi değişince admin listesi yeniden alınır
+    clear_admin_roster(member_update.chat.id)
+
+
+async def handle_chat_title(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Sohbet başlığı değişince sohbet bilgisi cache'ini temizle"""
+    chat = update.effective_chat
+    if not chat:
+        return
+
+    clear_chat_info(chat.id)
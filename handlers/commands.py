@@ -9,18 +9,21 @@ from telegram.error import TelegramError
 
 from database import db
 from templates import MENU, STATS, BUTTONS, ERRORS
-from services.message_service import get_user_stats
+from services.message_service import get_user_stats, flush_message_buffer
 from services.randy_service import (
     get_active_randy, start_randy, end_randy,
     register_group, update_group_admin, get_user_admin_groups,
     get_group_draft, get_randy_by_message_id, end_randy_with_count, get_participant_count,
-    update_randy_winner_count, update_draft_winner_count, get_randy_channels,
+    update_randy_winner_count, update_draft_winner_count,
     get_or_create_group_draft
 )
 from services.tagging_service import (
     start_etiket_tagging, start_naber_tagging, stop_tagging,
     is_tagging_active, get_tagging_type
 )
+from services.randy_announcement import (
+    render_randy_announcement, edit_randy_announcement, cancel_announcement_edits
+)
 from utils.admin_check import is_group_admin, is_system_user, can_anonymous_admin_use_commands, is_activity_group_admin
 
 
@@ -64,6 +67,8 @@ async def _handle_randy_reply_end(update: Update, context: ContextTypes.DEFAULT_
     # Randy'yi bitir (varsayılan kazanan sayısı ile)
     from templates import RANDY as RANDY_TEMPLATES, format_winner_list
 
+    # Bekleyen katılım güncellemesi sonuç mesajını ezmesin
+    cancel_announcement_edits(randy['id'])
     success, winners = await end_randy_with_count(randy['id'], winner_count)
 
     if not success:
@@ -154,26 +159,11 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # Admin ise direkt Randy ayar menüsüne yönlendir
-    from services.randy_service import get_or_create_group_draft, get_user_admin_groups, register_group, update_group_admin
-    from config import ACTIVITY_GROUP_ID
+    from services.randy_service import get_or_create_group_draft, get_user_admin_groups
 
-    # Admin olduğu grupları getir
+    # Admin olduğu grupları getir (group_admins, sync_group_admins_job ile güncel tutulur)
     groups = await get_user_admin_groups(user.id, context.bot)
 
-    # ACTIVITY_GROUP_ID tanımlı ama gruplar boşsa, grubu kaydet
-    if not groups and ACTIVITY_GROUP_ID and ACTIVITY_GROUP_ID != 0:
-        try:
-            chat_info = await context.bot.get_chat(ACTIVITY_GROUP_ID)
-            await register_group(ACTIVITY_GROUP_ID, chat_info.title)
-            await update_group_admin(ACTIVITY_GROUP_ID, user.id, True)
-
-            groups = [{
-                'group_id': ACTIVITY_GROUP_ID,
-                'title': chat_info.title or f"Grup {ACTIVITY_GROUP_ID}"
-            }]
-        except Exception as e:
-            print(f"❌ Grup bilgisi alma hatası: {e}")
-
     if not groups:
         await message.reply_text(
             "❌ <b>Admin olduğunuz grup bulunamadı.</b>\n\n"
@@ -310,67 +300,7 @@ async def randy_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
 
         # Randy mesajını oluştur
-        from templates import RANDY as RANDY_TEMPLATES, get_period_text
-        from services.randy_service import get_randy_channels
-        from config import ACTIVITY_GROUP_ID
-
-        # Zorunlu kanalları al (activity dahil)
-        channels_list = []
-
-        # Activity group'u ekle
-        if ACTIVITY_GROUP_ID and ACTIVITY_GROUP_ID != 0:
-            try:
-                activity_chat = await context.bot.get_chat(ACTIVITY_GROUP_ID)
-                if activity_chat.username:
-                    channels_list.append(f'<a href="https://t.me/{activity_chat.username}">{activity_chat.title or activity_chat.username}</a>')
-                elif activity_chat.title:
-                    channels_list.append(activity_chat.title)
-            except:
-                pass
-
-        # Eklenen zorunlu kanalları al
-        randy_channels = await get_randy_channels(randy_data['id'])
-        for ch in randy_channels:
-            if ch.get('channel_username'):
-                title = ch.get('channel_title') or ch['channel_username']
-                channels_list.append(f'<a href="https://t.me/{ch["channel_username"]}">{title}</a>')
-            elif ch.get('channel_title'):
-                channels_list.append(ch['channel_title'])
-
-        # Kanal metni oluştur (alt alta)
-        if channels_list:
-            channels_text = "📢 <b>Zorunlu:</b>\n" + "\n".join(channels_list) + "\n\n"
-        else:
-            channels_text = ""
-
-        # Şart varsa şartlı template kullan
-        req_type = randy_data.get('requirement_type', 'none')
-        req_count = randy_data.get('required_message_count', 0)
-
-        if req_type != 'none' and req_count > 0:
-            period_text = get_period_text(req_type)
-            requirement = f"{period_text} {req_count} mesaj"
-            text = RANDY_TEMPLATES["BASLADI_SARTLI"].format(
-                message=randy_data['message'],
-                requirement=requirement,
-                channels_text=channels_text,
-                participants=0,
-                winners=randy_data['winner_count']
-            )
-        else:
-            text = RANDY_TEMPLATES["BASLADI"].format(
-                message=randy_data['message'],
-                channels_text=channels_text,
-                participants=0,
-                winners=randy_data['winner_count']
-            )
-
-        keyboard = [[
-            InlineKeyboardButton(
-                f"🎉 Katıl (0)",
-                callback_data=f"randy_join_{randy_data['id']}"
-            )
-        ]]
+        text, reply_markup = await render_randy_announcement(context.bot, randy_data, 0)
 
         # Medya varsa medyalı gönder
         if randy_data.get('media_file_id') and randy_data.get('media_type') != 'none':
@@ -383,7 +313,7 @@ async def randy_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         chat.id,
                         photo=file_id,
                         caption=text,
-                        reply_markup=InlineKeyboardMarkup(keyboard),
+                        reply_markup=reply_markup,
                         parse_mode="HTML"
                     )
                 elif media_type == 'video':
@@ -391,7 +321,7 @@ async def randy_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         chat.id,
                         video=file_id,
                         caption=text,
-                        reply_markup=InlineKeyboardMarkup(keyboard),
+                        reply_markup=reply_markup,
                         parse_mode="HTML"
                     )
                 elif media_type == 'animation':
@@ -399,28 +329,28 @@ async def randy_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         chat.id,
                         animation=file_id,
                         caption=text,
-                        reply_markup=InlineKeyboardMarkup(keyboard),
+                        reply_markup=reply_markup,
                         parse_mode="HTML"
                     )
                 else:
                     sent_msg = await context.bot.send_message(
                         chat.id,
                         text,
-                        reply_markup=InlineKeyboardMarkup(keyboard),
+                        reply_markup=reply_markup,
                         parse_mode="HTML"
                     )
             except TelegramError:
                 sent_msg = await context.bot.send_message(
                     chat.id,
                     text,
-                    reply_markup=InlineKeyboardMarkup(keyboard),
+                    reply_markup=reply_markup,
                     parse_mode="HTML"
                 )
         else:
             sent_msg = await context.bot.send_message(
                 chat.id,
                 text,
-                reply_markup=InlineKeyboardMarkup(keyboard),
+                reply_markup=reply_markup,
                 parse_mode="HTML"
             )
 
@@ -454,26 +384,11 @@ async def randy_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # Direkt Randy ayar menüsüne yönlendir
-    from services.randy_service import get_or_create_group_draft, get_user_admin_groups, register_group, update_group_admin
-    from config import ACTIVITY_GROUP_ID
+    from services.randy_service import get_or_create_group_draft, get_user_admin_groups
 
-    # Admin olduğu grupları getir
+    # Admin olduğu grupları getir (group_admins, sync_group_admins_job ile güncel tutulur)
     groups = await get_user_admin_groups(user.id, context.bot)
 
-    # ACTIVITY_GROUP_ID tanımlı ama gruplar boşsa, grubu kaydet
-    if not groups and ACTIVITY_GROUP_ID and ACTIVITY_GROUP_ID != 0:
-        try:
-            chat_info = await context.bot.get_chat(ACTIVITY_GROUP_ID)
-            await register_group(ACTIVITY_GROUP_ID, chat_info.title)
-            await update_group_admin(ACTIVITY_GROUP_ID, user.id, True)
-
-            groups = [{
-                'group_id': ACTIVITY_GROUP_ID,
-                'title': chat_info.title or f"Grup {ACTIVITY_GROUP_ID}"
-            }]
-        except Exception as e:
-            print(f"❌ Grup bilgisi alma hatası: {e}")
-
     if not groups:
         await message.reply_text(
             "❌ <b>Admin olduğunuz grup bulunamadı.</b>\n\n"
@@ -623,85 +538,14 @@ async def number_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     participant_count = await get_participant_count(randy['id'])
 
     # Randy mesajını güncelle
-    from templates import RANDY as RANDY_TEMPLATES, get_period_text
-    from config import ACTIVITY_GROUP_ID
-
-    # Zorunlu kanalları al (activity dahil)
-    channels_list = []
-
-    # Activity group'u ekle
-    if ACTIVITY_GROUP_ID and ACTIVITY_GROUP_ID != 0:
-        try:
-            activity_chat = await context.bot.get_chat(ACTIVITY_GROUP_ID)
-            if activity_chat.username:
-                channels_list.append(f'<a href="https://t.me/{activity_chat.username}">{activity_chat.title or activity_chat.username}</a>')
-            elif activity_chat.title:
-                channels_list.append(activity_chat.title)
-        except:
-            pass
-
-    # Eklenen zorunlu kanalları al
-    randy_channels = await get_randy_channels(randy['id'])
-    for ch in randy_channels:
-        if ch.get('channel_username'):
-            title = ch.get('channel_title') or ch['channel_username']
-            channels_list.append(f'<a href="https://t.me/{ch["channel_username"]}">{title}</a>')
-        elif ch.get('channel_title'):
-            channels_list.append(ch['channel_title'])
-
-    # Kanal metni oluştur (alt alta)
-    if channels_list:
-        channels_text = "📢 <b>Zorunlu:</b>\n" + "\n".join(channels_list) + "\n\n"
-    else:
-        channels_text = ""
-
-    # Şart varsa şartlı template kullan
-    req_type = randy.get('requirement_type', 'none')
-    req_count = randy.get('required_message_count', 0)
-
-    if req_type != 'none' and req_count > 0:
-        period_text = get_period_text(req_type)
-        requirement = f"{period_text} {req_count} mesaj"
-        text = RANDY_TEMPLATES["BASLADI_SARTLI"].format(
-            message=randy['message'],
-            requirement=requirement,
-            channels_text=channels_text,
-            participants=participant_count,
-            winners=winner_count
-        )
-    else:
-        text = RANDY_TEMPLATES["BASLADI"].format(
-            message=randy['message'],
-            channels_text=channels_text,
-            participants=participant_count,
-            winners=winner_count
-        )
-
-    keyboard = [[
-        InlineKeyboardButton(
-            f"🎉 Katıl ({participant_count})",
-            callback_data=f"randy_join_{randy['id']}"
-        )
-    ]]
+    randy['winner_count'] = winner_count
+    text, reply_markup = await render_randy_announcement(context.bot, randy, participant_count)
 
     # Orijinal Randy mesajını düzenle
     try:
-        if randy.get('media_file_id') and randy.get('media_type') != 'none':
-            await context.bot.edit_message_caption(
-                chat_id=chat.id,
-                message_id=randy['message_id'],
-                caption=text,
-                reply_markup=InlineKeyboardMarkup(keyboard),
-                parse_mode="HTML"
-            )
-        else:
-            await context.bot.edit_message_text(
-                chat_id=chat.id,
-                message_id=randy['message_id'],
-                text=text,
-                reply_markup=InlineKeyboardMarkup(keyboard),
-                parse_mode="HTML"
-            )
+        await edit_randy_announcement(
+            context.bot, randy, chat.id, randy['message_id'], text, reply_markup
+        )
 
         # Bildirim mesajı gönder
         import asyncio
@@ -790,6 +634,8 @@ async def _finish_randy(context, chat_id: int, randy: dict):
     participant_count = await get_participant_count(randy['id'])
     winner_count = randy['winner_count']
 
+    # Bekleyen katılım güncellemesi sonuç mesajını ezmesin
+    cancel_announcement_edits(randy['id'])
     success, winners = await end_randy_with_count(randy['id'], winner_count)
 
     if not success:
@@ -932,6 +778,9 @@ async def _leaderboard_command(update: Update, context: ContextTypes.DEFAULT_TYP
     if not is_admin:
         return
 
+    # Tampondaki mesajları yaz, sıralama güncel olsun
+    await flush_message_buffer()
+
     # Veritabanından sıralama al
     async with db.pool.acquire() as conn:
         if period == 'daily':
@@ -983,13 +832,13 @@ async def _leaderboard_command(update: Update, context: ContextTypes.DEFAULT_TYP
 
 
 # ============================================
-# /etiket - Toplu Etiketleme (5'erli)
+# /etiket - Toplu Etiketleme
 # ============================================
 
 async def etiket_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     /etiket [mesaj] komutu
-    Gruptaki kayıtlı kullanıcıları 5'erli gruplar halinde etiketler
+    Gruptaki kayıtlı kullanıcıları mesaj başına sığabildiği kadar mention ile etiketler
     Premium emoji destekli
     """
     chat = update.effective_chat
@@ -1013,7 +862,7 @@ async def etiket_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # Zaten aktif etiketleme var mı?
-    if is_tagging_active(chat.id):
+    if await is_tagging_active(chat.id):
         info_msg = await context.bot.send_message(
             chat.id,
             "⚠️ Zaten aktif bir etiketleme işlemi var.\n"
@@ -1046,7 +895,7 @@ async def etiket_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         info_msg = await context.bot.send_message(
             chat.id,
             "❌ Etiketleme başlatılamadı.\n"
-            "Kayıtlı kullanıcı yok veya bir hata oluştu.",
+            "Kayıtlı kullanıcı yok, mesaj çok uzun veya bir hata oluştu.",
             parse_mode="HTML"
         )
         import asyncio
@@ -1088,7 +937,7 @@ async def naber_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # Zaten aktif etiketleme var mı?
-    if is_tagging_active(chat.id):
+    if await is_tagging_active(chat.id):
         info_msg = await context.bot.send_message(
             chat.id,
             "⚠️ Zaten aktif bir etiketleme işlemi var.\n"
@@ -1161,7 +1010,7 @@ async def dur_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         pass
 
     # Aktif etiketleme var mı?
-    tagging_type = get_tagging_type(chat.id)
+    tagging_type = await get_tagging_type(chat.id)
 
     if not tagging_type:
         info_msg = await context.bot.send_message(
@@ -1178,7 +1027,7 @@ async def dur_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # Etiketlemeyi durdur
-    stopped = stop_tagging(chat.id)
+    stopped = await stop_tagging(chat.id)
 
     if stopped:
         type_text = "Etiketleme" if tagging_type == "etiket" else "Naber"
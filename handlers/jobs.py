@@ -0,0 +1,180 @@
+"""
+⏱️ Zamanlanmış Görevler
+JobQueue üzerinde periyodik çalışan işler
+"""
+
+import asyncio
+from datetime import time
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    from backports.zoneinfo import ZoneInfo
+
+from telegram.ext import Application, ContextTypes
+
+from config import (
+    MESSAGE_FLUSH_INTERVAL, ACTIVITY_FLUSH_INTERVAL, ACTIVITY_HOURLY_RETENTION_DAYS,
+    ROLL_FLUSH_INTERVAL, CLEANUP_THROTTLE_MS, POST_RANDY_FLUSH_INTERVAL,
+    ADMIN_SYNC_INTERVAL, ADMIN_SYNC_CONCURRENCY, ACTIVITY_GROUP_ID,
+    TAGGING_JOB_HEARTBEAT_INTERVAL
+)
+from services.message_service import (
+    flush_message_buffer, reset_period_counts, flush_activity_buffer,
+    compact_message_activity, TR_TZ_NAME
+)
+from services.roll_service import flush_roll_activity, evict_inactive_users
+from services.randy_service import (
+    flush_post_randy_counts, get_active_group_ids, replace_group_admins, register_group
+)
+from services.tagging_service import heartbeat_tagging_jobs, resume_tagging_jobs
+from utils.admin_check import refresh_admin_roster
+from utils.chat_info import get_chat_info
+
+# Türkiye saat dilimi
+TR_TZ = ZoneInfo(TR_TZ_NAME)
+TR_MIDNIGHT = time(0, 0, tzinfo=TR_TZ)
+
+
+async def flush_message_buffer_job(context: ContextTypes.DEFAULT_TYPE):
+    """Mesaj sayacı tamponunu veritabanına yaz"""
+    await flush_message_buffer()
+
+
+async def flush_activity_buffer_job(context: ContextTypes.DEFAULT_TYPE):
+    """Saatlik aktivite tamponunu veritabanına yaz"""
+    await flush_activity_buffer()
+
+
+async def compact_activity_job(context: ContextTypes.DEFAULT_TYPE):
+    """Eski saatlik aktivite kovalarını günlük kovalara sıkıştır"""
+    await flush_activity_buffer()
+    await compact_message_activity(ACTIVITY_HOURLY_RETENTION_DAYS)
+
+
+async def flush_roll_activity_job(context: ContextTypes.DEFAULT_TYPE):
+    """Bekleyen roll aktivitesini veritabanına yaz"""
+    await flush_roll_activity()
+
+
+async def flush_post_randy_counts_job(context: ContextTypes.DEFAULT_TYPE):
+    """Bekleyen Randy sonrası mesaj sayılarını veritabanına yaz"""
+    await flush_post_randy_counts()
+
+
+async def evict_inactive_users_job(context: ContextTypes.DEFAULT_TYPE):
+    """Aktif roll'lardaki süresi dolmuş kullanıcıları temizle"""
+    await evict_inactive_users()
+
+
+async def tagging_jobs_job(context: ContextTypes.DEFAULT_TYPE):
+    """Çalışan etiketleme işlerinin heartbeat'ini yenile, sahipsiz kalanları devral"""
+    await heartbeat_tagging_jobs()
+    await resume_tagging_jobs(context.bot)
+
+
+async def sync_group_admins_job(context: ContextTypes.DEFAULT_TYPE):
+    """group_admins tablosunu gruplardaki güncel admin listeleriyle eşitle"""
+    bot = context.bot
+    group_ids = await get_active_group_ids()
+
+    # Activity group her zaman kayıtlı olsun (özel menü grup listesi buradan gelir)
+    if ACTIVITY_GROUP_ID and ACTIVITY_GROUP_ID != 0 and ACTIVITY_GROUP_ID not in group_ids:
+        try:
+            chat = await get_chat_info(bot, ACTIVITY_GROUP_ID)
+            await register_group(ACTIVITY_GROUP_ID, chat.title)
+            group_ids.append(ACTIVITY_GROUP_ID)
+        except Exception as e:
+            print(f"❌ Grup bilgisi alma hatası: {e}")
+
+    semaphore = asyncio.Semaphore(ADMIN_SYNC_CONCURRENCY)
+
+    async def sync_group(group_id: int):
+        async with semaphore:
+            admin_ids = await refresh_admin_roster(bot, group_id)
+
+        # Liste alınamadıysa mevcut kayıtlara dokunulmaz
+        if admin_ids is not None:
+            await replace_group_admins(group_id, list(admin_ids))
+
+    await asyncio.gather(*(sync_group(group_id) for group_id in group_ids))
+
+
+async def period_rollover_job(context: ContextTypes.DEFAULT_TYPE):
+    """Günlük/haftalık/aylık sayaçları sıfırla (job.data = periyot)"""
+    await reset_period_counts(context.job.data)
+
+
+def schedule_jobs(application: Application) -> None:
+    """Periyodik görevleri JobQueue'ya ekle"""
+    job_queue = application.job_queue
+
+    if job_queue is None:
+        print("⚠️ JobQueue yok! python-telegram-bot[job-queue] kurulu olmalı.")
+        return
+
+    if MESSAGE_FLUSH_INTERVAL > 0:
+        job_queue.run_repeating(
+            flush_message_buffer_job,
+            interval=MESSAGE_FLUSH_INTERVAL,
+            first=MESSAGE_FLUSH_INTERVAL,
+            name="flush_message_buffer"
+        )
+
+    job_queue.run_repeating(
+        flush_activity_buffer_job,
+        interval=ACTIVITY_FLUSH_INTERVAL,
+        first=ACTIVITY_FLUSH_INTERVAL,
+        name="flush_activity_buffer"
+    )
+
+    job_queue.run_repeating(
+        flush_roll_activity_job,
+        interval=ROLL_FLUSH_INTERVAL,
+        first=ROLL_FLUSH_INTERVAL,
+        name="flush_roll_activity"
+    )
+
+    job_queue.run_repeating(
+        flush_post_randy_counts_job,
+        interval=POST_RANDY_FLUSH_INTERVAL,
+        first=POST_RANDY_FLUSH_INTERVAL,
+        name="flush_post_randy_counts"
+    )
+
+    # İnaktif kullanıcı tahliyesi (CLEANUP_THROTTLE_MS aralıkla)
+    cleanup_interval = max(1, CLEANUP_THROTTLE_MS / 1000)
+    job_queue.run_repeating(
+        evict_inactive_users_job,
+        interval=cleanup_interval,
+        first=cleanup_interval,
+        name="evict_inactive_users"
+    )
+
+    # Grup admin kayıtları (özel menüdeki grup listesi için)
+    job_queue.run_repeating(
+        sync_group_admins_job,
+        interval=ADMIN_SYNC_INTERVAL,
+        first=5,
+        name="sync_group_admins"
+    )
+
+    # Etiketleme işleri (heartbeat + başka süreçten kalan işleri devralma)
+    job_queue.run_repeating(
+        tagging_jobs_job,
+        interval=TAGGING_JOB_HEARTBEAT_INTERVAL,
+        first=TAGGING_JOB_HEARTBEAT_INTERVAL,
+        name="tagging_jobs"
+    )
+
+    # Aktivite sıkıştırma (trafiğin az olduğu saatte)
+    job_queue.run_daily(compact_activity_job, time(4, 0, tzinfo=TR_TZ), name="compact_activity")
+
+    # Periyot geçişleri (TR saati ile gece 00:00)
+    # Günlük: her gün, Haftalık: Pazartesi (PTB'de 0=Pazar, 1=Pazartesi), Aylık: ayın 1'i
+    job_queue.run_daily(period_rollover_job, TR_MIDNIGHT, data="daily", name="rollover_daily")
+    job_queue.run_daily(period_rollover_job, TR_MIDNIGHT, days=(1,), data="weekly", name="rollover_weekly")
+    job_queue.run_monthly(period_rollover_job, TR_MIDNIGHT, day=1, data="monthly", name="rollover_monthly")
+
+    # Bot kapalıyken kaçırılan geçişleri açılışta telafi et
+    for period in ("daily", "weekly", "monthly"):
+        job_queue.run_once(period_rollover_job, when=0, data=period, name=f"rollover_{period}_catchup")
@@ -21,6 +21,7 @@ from services.randy_service import (
     add_channel_to_draft, get_draft_channels,
     get_randy_by_message_id, get_participant_count, end_randy_with_count
 )
+from services.randy_announcement import cancel_announcement_edits
 from utils.admin_check import is_group_admin, is_system_user, can_anonymous_admin_use_commands
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from templates import MENU, BUTTONS, get_period_text, RANDY as RANDY_TEMPLATES, format_winner_list
@@ -362,7 +363,8 @@ async def _handle_randy_reply_end(update: Update, context: ContextTypes.DEFAULT_
     participant_count = await get_participant_count(randy['id'])
     winner_count = randy['winner_count']
 
-    # Randy'yi bitir
+    # Randy'yi bitir (bekleyen katılım güncellemesi sonuç mesajını ezmesin)
+    cancel_announcement_edits(randy['id'])
     success, winners = await end_randy_with_count(randy['id'], winner_count)
 
     if not success:
@@ -761,9 +763,8 @@ def _format_steps(steps: list, session_info: dict = None) -> str:
         lines.append(header)
 
         if users:
-            # Mesaj sayısına göre sırala
-            sorted_users = sorted(users, key=lambda x: x.get('message_count', 0), reverse=True)
-            for u in sorted_users:
+            # Kullanıcılar get_status_list'ten mesaj sayısına göre sıralı gelir
+            for u in users:
                 name = u.get('name', 'Kullanıcı')
                 count = u.get('message_count', 0)
                 lines.append(f"✅ {name} • {count} ✉️")
@@ -3,18 +3,38 @@
 Kullanıcı mesajlarını sayar ve istatistikleri yönetir
 """
 
+import asyncio
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-try:
-    from zoneinfo import ZoneInfo
-except ImportError:
-    from backports.zoneinfo import ZoneInfo
-
+from typing import Optional, Dict, Any, Tuple
 from database import db
-from config import IGNORED_USER_IDS
+from config import (
+    IGNORED_USER_IDS, MESSAGE_FLUSH_INTERVAL, MESSAGE_FLUSH_MAX_PENDING,
+    REQUIREMENT_RECENT_HOURS
+)
+
+# Türkiye saat dilimi (reset sınırları bu bölgeye göre hesaplanır)
+TR_TZ_NAME = "Europe/Istanbul"
+
+# Periyot -> (sayaç kolonu, son reset kolonu, date_trunc birimi)
+_PERIOD_COLUMNS = {
+    "daily": ("daily_count", "last_daily_reset", "day"),
+    "weekly": ("weekly_count", "last_weekly_reset", "week"),
+    "monthly": ("monthly_count", "last_monthly_reset", "month"),
+}
+
+
+# ========== YAZMA TAMPONU ==========
+# Mesaj sayaçları her mesajda veritabanına yazılmaz; bellekte toplanır ve
+# belirli aralıklarla tek bir toplu upsert ile yazılır.
+# {(telegram_id, group_id): {"count", "username", "first_name", "last_name", "last_at"}}
+_pending_counts: Dict[Tuple[int, int], Dict[str, Any]] = {}
+_flush_lock = asyncio.Lock()
+# Son flush başarısız olduysa eşik flush'ı bir sonraki zamanlanmış flush'a kadar atlanır
+_flush_failed = False
 
-# Türkiye saat dilimi
-TR_TZ = ZoneInfo("Europe/Istanbul")
+# Saatlik aktivite tamponu: {(group_id, telegram_id, saat_başı_utc): mesaj_sayısı}
+_pending_activity: Dict[Tuple[int, int, datetime], int] = {}
+_activity_flush_lock = asyncio.Lock()
 
 
 async def track_message(
@@ -25,7 +45,7 @@ async def track_message(
     last_name: str = None
 ) -> bool:
     """
-    Kullanıcı mesajını kaydet ve sayaçları güncelle
+    Kullanıcı mesajını tampona ekle (veritabanına flush_message_buffer yazar)
 
     Args:
         telegram_id: Telegram kullanıcı ID
@@ -41,89 +61,211 @@ async def track_message(
     if telegram_id in IGNORED_USER_IDS:
         return False
 
+    now = datetime.utcnow()
+
+    # Saatlik aktivite kovası (her zaman tamponlanır)
+    bucket_key = (group_id, telegram_id, now.replace(minute=0, second=0, microsecond=0))
+    _pending_activity[bucket_key] = _pending_activity.get(bucket_key, 0) + 1
+
+    # Tampon kapalıysa tek sorguda doğrudan yaz
+    if MESSAGE_FLUSH_INTERVAL <= 0:
+        try:
+            async with db.pool.acquire() as conn:
+                await _upsert_counts(conn, {
+                    (telegram_id, group_id): {
+                        "count": 1, "username": username, "first_name": first_name,
+                        "last_name": last_name, "last_at": now
+                    }
+                })
+            return True
+        except Exception as e:
+            print(f"❌ Mesaj kaydetme hatası: {e}")
+            return False
+
+    key = (telegram_id, group_id)
+    entry = _pending_counts.get(key)
+
+    if entry is None:
+        entry = {"count": 0, "username": None, "first_name": None, "last_name": None, "last_at": None}
+        _pending_counts[key] = entry
+
+    entry["count"] += 1
+    entry["username"] = username or entry["username"]
+    entry["first_name"] = first_name or entry["first_name"]
+    entry["last_name"] = last_name or entry["last_name"]
+    entry["last_at"] = now
+
+    # Eşik aşıldıysa beklemeden yaz (veritabanı hata veriyorsa veya flush zaten
+    # sürüyorsa her mesaj yeni bir deneme başlatmaz; zamanlanmış görev tekrar dener)
+    if (len(_pending_counts) >= MESSAGE_FLUSH_MAX_PENDING
+            and not _flush_failed and not _flush_lock.locked()):
+        await flush_message_buffer()
+
+    return True
+
+
+async def flush_message_buffer() -> int:
+    """
+    Tampondaki mesaj sayaçlarını tek sorguda veritabanına yaz
+
+    Returns:
+        int: Yazılan (kullanıcı, grup) satır sayısı
+    """
+    global _pending_counts, _flush_failed
+
+    async with _flush_lock:
+        if not _pending_counts:
+            return 0
+
+        # Tamponu değiştir - flush sırasında gelen mesajlar yeni tampona düşer
+        batch = _pending_counts
+        _pending_counts = {}
+
+        try:
+            async with db.pool.acquire() as conn:
+                await _upsert_counts(conn, batch)
+            _flush_failed = False
+            return len(batch)
+
+        except Exception as e:
+            print(f"❌ Mesaj tamponu yazma hatası: {e}")
+            _restore_pending(batch)
+            _flush_failed = True
+            return 0
+
+
+async def _upsert_counts(conn, batch: Dict[Tuple[int, int], Dict[str, Any]]):
+    """
+    Sayaçları tek INSERT ... ON CONFLICT DO UPDATE ile yaz
+
+    Gün/hafta/ay sınırları (Türkiye saati) sorgu içinde de kontrol edilir; böylece
+    gece yarısı ile reset_period_counts arasında yazılan mesajlar eski periyoda
+    eklenmez. Zamanlanmış görev sadece o periyotta hiç mesaj atmamış satırları sıfırlar.
+    """
+    telegram_ids, group_ids = [], []
+    usernames, first_names, last_names = [], [], []
+    counts, last_ats = [], []
+
+    for (telegram_id, group_id), entry in batch.items():
+        telegram_ids.append(telegram_id)
+        group_ids.append(group_id)
+        usernames.append(entry["username"])
+        first_names.append(entry["first_name"])
+        last_names.append(entry["last_name"])
+        counts.append(entry["count"])
+        last_ats.append(entry["last_at"])
+
+    await conn.execute("""
+        WITH bounds AS (
+            SELECT NOW() AT TIME ZONE 'UTC' AS now_utc,
+                   date_trunc('day', NOW() AT TIME ZONE $8::text) AT TIME ZONE $8::text AT TIME ZONE 'UTC' AS day_start,
+                   date_trunc('week', NOW() AT TIME ZONE $8::text) AT TIME ZONE $8::text AT TIME ZONE 'UTC' AS week_start,
+                   date_trunc('month', NOW() AT TIME ZONE $8::text) AT TIME ZONE $8::text AT TIME ZONE 'UTC' AS month_start
+        )
+        INSERT INTO telegram_users (
+            telegram_id, group_id, username, first_name, last_name,
+            message_count, daily_count, weekly_count, monthly_count,
+            last_message_at, last_daily_reset, last_weekly_reset, last_monthly_reset,
+            updated_at
+        )
+        SELECT t.telegram_id, t.group_id, t.username, t.first_name, t.last_name,
+               t.delta, t.delta, t.delta, t.delta,
+               t.last_at, b.now_utc, b.now_utc, b.now_utc, b.now_utc
+        FROM unnest(
+            $1::bigint[], $2::bigint[], $3::text[], $4::text[], $5::text[],
+            $6::int[], $7::timestamp[]
+        ) AS t(telegram_id, group_id, username, first_name, last_name, delta, last_at)
+        CROSS JOIN bounds b
+        ON CONFLICT (telegram_id, group_id) DO UPDATE SET
+            message_count = telegram_users.message_count + EXCLUDED.message_count,
+            daily_count = CASE
+                WHEN COALESCE(telegram_users.last_daily_reset, '-infinity') < (SELECT day_start FROM bounds)
+                THEN EXCLUDED.daily_count
+                ELSE telegram_users.daily_count + EXCLUDED.daily_count
+            END,
+            weekly_count = CASE
+                WHEN COALESCE(telegram_users.last_weekly_reset, '-infinity') < (SELECT week_start FROM bounds)
+                THEN EXCLUDED.weekly_count
+                ELSE telegram_users.weekly_count + EXCLUDED.weekly_count
+            END,
+            monthly_count = CASE
+                WHEN COALESCE(telegram_users.last_monthly_reset, '-infinity') < (SELECT month_start FROM bounds)
+                THEN EXCLUDED.monthly_count
+                ELSE telegram_users.monthly_count + EXCLUDED.monthly_count
+            END,
+            last_daily_reset = CASE
+                WHEN COALESCE(telegram_users.last_daily_reset, '-infinity') < (SELECT day_start FROM bounds)
+                THEN EXCLUDED.last_daily_reset ELSE telegram_users.last_daily_reset
+            END,
+            last_weekly_reset = CASE
+                WHEN COALESCE(telegram_users.last_weekly_reset, '-infinity') < (SELECT week_start FROM bounds)
+                THEN EXCLUDED.last_weekly_reset ELSE telegram_users.last_weekly_reset
+            END,
+            last_monthly_reset = CASE
+                WHEN COALESCE(telegram_users.last_monthly_reset, '-infinity') < (SELECT month_start FROM bounds)
+                THEN EXCLUDED.last_monthly_reset ELSE telegram_users.last_monthly_reset
+            END,
+            username = COALESCE(EXCLUDED.username, telegram_users.username),
+            first_name = COALESCE(EXCLUDED.first_name, telegram_users.first_name),
+            last_name = COALESCE(EXCLUDED.last_name, telegram_users.last_name),
+            last_message_at = EXCLUDED.last_message_at,
+            updated_at = EXCLUDED.updated_at
+    """,
+        telegram_ids, group_ids, usernames, first_names, last_names,
+        counts, last_ats, TR_TZ_NAME
+    )
+
+
+async def reset_period_counts(period: str) -> int:
+    """
+    Periyot sayaçlarını tüm satırlar için tek UPDATE ile sıfırla
+
+    Sadece son reset'i Türkiye saatine göre mevcut periyodun başından önce olan
+    satırlar etkilenir; bu yüzden tekrar çalıştırmak güvenlidir ve bot kapalıyken
+    kaçırılan geçişler açılışta telafi edilir.
+
+    Args:
+        period: daily, weekly veya monthly
+
+    Returns:
+        int: Sıfırlanan satır sayısı
+    """
+    count_field, reset_field, trunc_unit = _PERIOD_COLUMNS[period]
+
+    # Önceki periyoda ait bekleyen mesajları önce yaz
+    await flush_message_buffer()
+
     try:
         async with db.pool.acquire() as conn:
-            now = datetime.utcnow()
+            result = await conn.execute(f"""
+                UPDATE telegram_users
+                SET {count_field} = 0, {reset_field} = NOW() AT TIME ZONE 'UTC'
+                WHERE COALESCE({reset_field}, '-infinity') <
+                      date_trunc('{trunc_unit}', NOW() AT TIME ZONE $1::text) AT TIME ZONE $1::text AT TIME ZONE 'UTC'
+            """, TR_TZ_NAME)
 
-            # Kullanıcı var mı kontrol et
-            user = await conn.fetchrow("""
-                SELECT id, last_daily_reset, last_weekly_reset, last_monthly_reset
-                FROM telegram_users
-                WHERE telegram_id = $1 AND group_id = $2
-            """, telegram_id, group_id)
+            reset_count = int(result.split()[-1]) if result else 0
+            print(f"🔄 {period} sayaçları sıfırlandı: {reset_count} satır")
+            return reset_count
 
-            if user:
-                # Reset kontrolü
-                daily_reset = user['last_daily_reset']
-                weekly_reset = user['last_weekly_reset']
-                monthly_reset = user['last_monthly_reset']
-
-                # Günlük reset (her gün 00:00 UTC+3)
-                daily_count_add = 1
-                new_daily_reset = daily_reset
-                if _should_reset_daily(daily_reset, now):
-                    daily_count_add = 1  # Sıfırla ve 1 ekle
-                    new_daily_reset = now
-                    await conn.execute("""
-                        UPDATE telegram_users
-                        SET daily_count = 0, last_daily_reset = $1
-                        WHERE id = $2
-                    """, now, user['id'])
-
-                # Haftalık reset (her Pazartesi 00:00 UTC+3)
-                weekly_count_add = 1
-                new_weekly_reset = weekly_reset
-                if _should_reset_weekly(weekly_reset, now):
-                    weekly_count_add = 1
-                    new_weekly_reset = now
-                    await conn.execute("""
-                        UPDATE telegram_users
-                        SET weekly_count = 0, last_weekly_reset = $1
-                        WHERE id = $2
-                    """, now, user['id'])
-
-                # Aylık reset (her ayın 1'i 00:00 UTC+3)
-                monthly_count_add = 1
-                new_monthly_reset = monthly_reset
-                if _should_reset_monthly(monthly_reset, now):
-                    monthly_count_add = 1
-                    new_monthly_reset = now
-                    await conn.execute("""
-                        UPDATE telegram_users
-                        SET monthly_count = 0, last_monthly_reset = $1
-                        WHERE id = $2
-                    """, now, user['id'])
-
-                # Sayaçları güncelle
-                await conn.execute("""
-                    UPDATE telegram_users
-                    SET message_count = message_count + 1,
-                        daily_count = daily_count + 1,
-                        weekly_count = weekly_count + 1,
-                        monthly_count = monthly_count + 1,
-                        username = COALESCE($1, username),
-                        first_name = COALESCE($2, first_name),
-                        last_name = COALESCE($3, last_name),
-                        last_message_at = $4,
-                        updated_at = $4
-                    WHERE id = $5
-                """, username, first_name, last_name, now, user['id'])
-
-            else:
-                # Yeni kullanıcı oluştur
-                await conn.execute("""
-                    INSERT INTO telegram_users (
-                        telegram_id, group_id, username, first_name, last_name,
-                        message_count, daily_count, weekly_count, monthly_count,
-                        last_message_at, last_daily_reset, last_weekly_reset, last_monthly_reset
-                    ) VALUES ($1, $2, $3, $4, $5, 1, 1, 1, 1, $6, $6, $6, $6)
-                """, telegram_id, group_id, username, first_name, last_name, now)
+    except Exception as e:
+        print(f"❌ Periyot sıfırlama hatası ({period}): {e}")
+        return 0
 
-            return True
 
-    except Exception as e:
-        print(f"❌ Mesaj kaydetme hatası: {e}")
-        return False
+def _restore_pending(batch: Dict[Tuple[int, int], Dict[str, Any]]):
+    """Yazılamayan sayaçları tampona geri ekle (bir sonraki flush'ta denenir)"""
+    for key, old in batch.items():
+        entry = _pending_counts.get(key)
+
+        if entry is None:
+            _pending_counts[key] = old
+            continue
+
+        entry["count"] += old["count"]
+        entry["username"] = entry["username"] or old["username"]
+        entry["first_name"] = entry["first_name"] or old["first_name"]
+        entry["last_name"] = entry["last_name"] or old["last_name"]
 
 
 async def get_user_stats(telegram_id: int, group_id: int) -> Optional[Dict[str, Any]]:
@@ -137,6 +279,10 @@ async def get_user_stats(telegram_id: int, group_id: int) -> Optional[Dict[str,
     Returns:
         dict: İstatistikler veya None
     """
+    # Kullanıcının yazılmamış mesajları varsa önce tamponu boşalt (sayılar kesin olsun)
+    if (telegram_id, group_id) in _pending_counts:
+        await flush_message_buffer()
+
     try:
         async with db.pool.acquire() as conn:
             user = await conn.fetchrow("""
@@ -178,12 +324,18 @@ async def check_message_requirement(
     Args:
         telegram_id: Telegram kullanıcı ID
         group_id: Grup ID
-        requirement_type: Şart tipi (daily, weekly, monthly, all_time)
+        requirement_type: Şart tipi (daily, weekly, monthly, recent, all_time)
         required_count: Gerekli mesaj sayısı
 
     Returns:
         tuple: (Karşılandı mı, Mevcut sayı)
     """
+    # Kayan pencere (son N saat) saatlik aktivite kovalarından hesaplanır
+    if requirement_type == "recent":
+        since = datetime.utcnow() - timedelta(hours=REQUIREMENT_RECENT_HOURS)
+        current = await get_message_count_since(telegram_id, group_id, since)
+        return current >= required_count, current
+
     stats = await get_user_stats(telegram_id, group_id)
 
     if not stats:
@@ -201,49 +353,136 @@ async def check_message_requirement(
     return current >= required_count, current
 
 
-def _get_tr_time(dt: datetime) -> datetime:
-    """UTC datetime'ı Türkiye saatine çevir"""
-    if dt is None:
-        return None
-    # UTC olarak işaretle ve TR'ye çevir
-    if dt.tzinfo is None:
-        from datetime import timezone
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(TR_TZ)
+# ============================================
+# SAATLİK AKTİVİTE (keyfi zaman aralığı sorguları)
+# ============================================
 
+async def flush_activity_buffer() -> int:
+    """
+    Saatlik aktivite tamponunu tek sorguda message_activity tablosuna yaz
 
-def _should_reset_daily(last_reset: datetime, now: datetime) -> bool:
-    """Günlük reset gerekli mi kontrol et (Türkiye saati - gece 00:00)"""
-    if not last_reset:
-        return True
+    Returns:
+        int: Yazılan kova sayısı
+    """
+    global _pending_activity
 
-    last_reset_tr = _get_tr_time(last_reset)
-    now_tr = _get_tr_time(now)
+    async with _activity_flush_lock:
+        if not _pending_activity:
+            return 0
 
-    return last_reset_tr.date() < now_tr.date()
+        batch = _pending_activity
+        _pending_activity = {}
 
+        group_ids, user_ids, buckets, counts = [], [], [], []
+        for (group_id, user_id, bucket), count in batch.items():
+            group_ids.append(group_id)
+            user_ids.append(user_id)
+            buckets.append(bucket)
+            counts.append(count)
 
-def _should_reset_weekly(last_reset: datetime, now: datetime) -> bool:
-    """Haftalık reset gerekli mi kontrol et (Pazartesi 00:00 TR)"""
-    if not last_reset:
-        return True
+        try:
+            async with db.pool.acquire() as conn:
+                await conn.execute("""
+                    INSERT INTO message_activity (group_id, user_id, bucket, message_count)
+                    SELECT * FROM unnest($1::bigint[], $2::bigint[], $3::timestamp[], $4::int[])
+                    ON CONFLICT (group_id, user_id, bucket) DO UPDATE
+                    SET message_count = message_activity.message_count + EXCLUDED.message_count
+                """, group_ids, user_ids, buckets, counts)
+            return len(batch)
 
-    last_reset_tr = _get_tr_time(last_reset)
-    now_tr = _get_tr_time(now)
+        except Exception as e:
+            print(f"❌ Aktivite tamponu yazma hatası: {e}")
+            for key, count in batch.items():
+                _pending_activity[key] = _pending_activity.get(key, 0) + count
+            return 0
 
-    # Pazartesi = 0
-    last_monday = last_reset_tr.date() - timedelta(days=last_reset_tr.weekday())
-    current_monday = now_tr.date() - timedelta(days=now_tr.weekday())
 
-    return last_monday < current_monday
+async def get_message_count_since(
+    telegram_id: int,
+    group_id: int,
+    since: datetime,
+    until: datetime = None
+) -> int:
+    """
+    Kullanıcının belirli bir zaman aralığındaki mesaj sayısını getir
 
+    Saklama süresinden eski veriler günlük kovalara sıkıştırıldığı için o
+    kısımda hassasiyet gün seviyesindedir.
 
-def _should_reset_monthly(last_reset: datetime, now: datetime) -> bool:
-    """Aylık reset gerekli mi kontrol et (Ayın 1'i 00:00 TR)"""
-    if not last_reset:
-        return True
+    Args:
+        telegram_id: Telegram kullanıcı ID
+        group_id: Grup ID
+        since: Başlangıç (UTC, dahil) - örn. datetime.utcnow() - timedelta(hours=72)
+        until: Bitiş (UTC, hariç) - None ise şimdi
 
-    last_reset_tr = _get_tr_time(last_reset)
-    now_tr = _get_tr_time(now)
+    Returns:
+        int: Mesaj sayısı
+    """
+    await flush_activity_buffer()
+
+    try:
+        async with db.pool.acquire() as conn:
+            # (group_id, user_id, bucket) INCLUDE (message_count) -> index-only scan
+            count = await conn.fetchval("""
+                SELECT COALESCE(SUM(message_count), 0)
+                FROM message_activity
+                WHERE group_id = $1 AND user_id = $2
+                  AND bucket >= date_trunc('hour', $3::timestamp)
+                  AND ($4::timestamp IS NULL OR bucket < $4::timestamp)
+            """, group_id, telegram_id, since, until)
+            return count or 0
+
+    except Exception as e:
+        print(f"❌ Aktivite sayısı getirme hatası: {e}")
+        return 0
+
+
+async def compact_message_activity(retention_days: int) -> int:
+    """
+    Saklama süresinden eski saatlik kovaları günlük kovalara sıkıştır
 
-    return (last_reset_tr.year, last_reset_tr.month) < (now_tr.year, now_tr.month)
+    Günler Türkiye saatine göredir: günün 00:00 (TR) kovası yerinde kalır ve günlük
+    kova olur; diğer saatler silinip ona eklenir. Tekrar çalıştırmak güvenlidir.
+
+    Args:
+        retention_days: Saatlik hassasiyetin korunacağı gün sayısı
+
+    Returns:
+        int: Sıkıştırılan saatlik kova sayısı
+    """
+    try:
+        async with db.pool.acquire() as conn:
+            # Kovalar UTC saklanır; TR gün başı: UTC -> TR -> gün başı -> UTC
+            moved = await conn.fetchval("""
+                WITH bounds AS (
+                    SELECT date_trunc('day', NOW() AT TIME ZONE $2::text) AT TIME ZONE $2::text AT TIME ZONE 'UTC'
+                           - make_interval(days => $1) AS cutoff
+                ), days AS (
+                    SELECT group_id, user_id, bucket, message_count,
+                           date_trunc('day', bucket AT TIME ZONE 'UTC' AT TIME ZONE $2::text)
+                               AT TIME ZONE $2::text AT TIME ZONE 'UTC' AS day
+                    FROM message_activity
+                    WHERE bucket < (SELECT cutoff FROM bounds)
+                ), moved AS (
+                    DELETE FROM message_activity a
+                    USING days d
+                    WHERE a.group_id = d.group_id AND a.user_id = d.user_id
+                      AND a.bucket = d.bucket AND d.bucket <> d.day
+                    RETURNING a.group_id, a.user_id, d.day, a.message_count
+                ), merged AS (
+                    INSERT INTO message_activity (group_id, user_id, bucket, message_count)
+                    SELECT group_id, user_id, day, SUM(message_count)
+                    FROM moved
+                    GROUP BY group_id, user_id, day
+                    ON CONFLICT (group_id, user_id, bucket) DO UPDATE
+                    SET message_count = message_activity.message_count + EXCLUDED.message_count
+                )
+                SELECT COUNT(*) FROM moved
+            """, retention_days, TR_TZ_NAME)
+
+            print(f"🗜️ Aktivite sıkıştırıldı: {moved} saatlik kova")
+            return moved or 0
+
+    except Exception as e:
+        print(f"❌ Aktivite sıkıştırma hatası: {e}")
+        return 0
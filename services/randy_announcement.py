@@ -0,0 +1,218 @@
+"""
+📣 Randy Duyuru Mesajı
+Randy mesajının oluşturulması ve katılımlarda toplu (debounce) güncellenmesi
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, Tuple
+from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import TelegramError, RetryAfter
+from templates import RANDY, get_period_text
+from config import ACTIVITY_GROUP_ID, RANDY_EDIT_INTERVAL
+from services.randy_service import get_randy_by_id, get_randy_channels, get_participant_count
+from utils.chat_info import get_chat_info
+
+
+# Bekleyen mesaj güncellemeleri (Randy bazlı)
+# {randy_id: {"chat_id", "message_id", "dirty", "task", "last_text", "last_edit"}}
+_edit_state: Dict[int, Dict[str, Any]] = {}
+
+
+async def render_randy_announcement(bot: Bot, randy: dict, participants: int) -> Tuple[str, InlineKeyboardMarkup]:
+    """
+    Randy duyuru metnini ve katıl butonunu oluştur
+
+    Args:
+        bot: Telegram Bot instance
+        randy: Randy bilgileri (id, message, requirement_type, required_message_count, winner_count)
+        participants: Katılımcı sayısı
+
+    Returns:
+        tuple: (Metin, Klavye)
+    """
+    # Zorunlu kanalları al (activity dahil)
+    channels_list = []
+
+    # Activity group'u ekle
+    if ACTIVITY_GROUP_ID and ACTIVITY_GROUP_ID != 0:
+        try:
+            activity_chat = await get_chat_info(bot, ACTIVITY_GROUP_ID)
+            if activity_chat.username:
+                channels_list.append(f'<a href="https://t.me/{activity_chat.username}">{activity_chat.title or activity_chat.username}</a>')
+            elif activity_chat.title:
+                channels_list.append(activity_chat.title)
+        except:
+            pass
+
+    # Eklenen zorunlu kanalları al
+    randy_channels = await get_randy_channels(randy['id'])
+    for ch in randy_channels:
+        if ch.get('channel_username'):
+            title = ch.get('channel_title') or ch['channel_username']
+            channels_list.append(f'<a href="https://t.me/{ch["channel_username"]}">{title}</a>')
+        elif ch.get('channel_title'):
+            channels_list.append(ch['channel_title'])
+
+    # Kanal metni oluştur (alt alta)
+    if channels_list:
+        channels_text = "📢 <b>Zorunlu:</b>\n" + "\n".join(channels_list) + "\n\n"
+    else:
+        channels_text = ""
+
+    # Şart varsa şartlı template kullan
+    req_type = randy.get('requirement_type', 'none')
+    req_count = randy.get('required_message_count', 0)
+
+    if req_type != 'none' and req_count > 0:
+        period_text = get_period_text(req_type)
+        requirement = f"{period_text} {req_count} mesaj"
+        text = RANDY["BASLADI_SARTLI"].format(
+            message=randy['message'],
+            requirement=requirement,
+            channels_text=channels_text,
+            participants=participants,
+            winners=randy['winner_count']
+        )
+    else:
+        text = RANDY["BASLADI"].format(
+            message=randy['message'],
+            channels_text=channels_text,
+            participants=participants,
+            winners=randy['winner_count']
+        )
+
+    keyboard = InlineKeyboardMarkup([[
+        InlineKeyboardButton(
+            f"🎉 Katıl ({participants})",
+            callback_data=f"randy_join_{randy['id']}"
+        )
+    ]])
+
+    return text, keyboard
+
+
+async def edit_randy_announcement(
+    bot: Bot,
+    randy: dict,
+    chat_id: int,
+    message_id: int,
+    text: str,
+    keyboard: InlineKeyboardMarkup
+):
+    """
+    Randy duyuru mesajını düzenle (medya varsa caption, yoksa text)
+
+    TelegramError yukarı iletilir.
+    """
+    if randy.get('media_file_id') and randy.get('media_type') != 'none':
+        await bot.edit_message_caption(
+            chat_id=chat_id,
+            message_id=message_id,
+            caption=text,
+            reply_markup=keyboard,
+            parse_mode="HTML"
+        )
+    else:
+        await bot.edit_message_text(
+            chat_id=chat_id,
+            message_id=message_id,
+            text=text,
+            reply_markup=keyboard,
+            parse_mode="HTML"
+        )
+
+    state = _edit_state.get(randy['id'])
+    if state is not None:
+        state['last_text'] = text
+        state['last_edit'] = time.monotonic()
+
+
+def schedule_announcement_edit(bot: Bot, randy_id: int, chat_id: int, message_id: int):
+    """
+    Randy mesajının güncellenmesini planla
+
+    Art arda gelen katılımlar birleştirilir; mesaj en fazla RANDY_EDIT_INTERVAL
+    saniyede bir, en güncel katılımcı sayısıyla düzenlenir.
+
+    Args:
+        bot: Telegram Bot instance
+        randy_id: Randy ID
+        chat_id: Randy mesajının grubu
+        message_id: Randy mesaj ID
+    """
+    state = _edit_state.get(randy_id)
+
+    if state is None:
+        state = {
+            "chat_id": chat_id,
+            "message_id": message_id,
+            "dirty": False,
+            "task": None,
+            "last_text": None,
+            "last_edit": 0.0
+        }
+        _edit_state[randy_id] = state
+
+    state['dirty'] = True
+
+    # Çalışan güncelleme varsa o son durumu da yazar
+    if state['task'] is None or state['task'].done():
+        state['task'] = asyncio.create_task(_edit_loop(bot, randy_id, state))
+
+
+def cancel_announcement_edits(randy_id: int):
+    """Randy bitince bekleyen mesaj güncellemelerini iptal et"""
+    state = _edit_state.pop(randy_id, None)
+
+    if state and state['task'] and not state['task'].done():
+        state['task'].cancel()
+
+
+async def _edit_loop(bot: Bot, randy_id: int, state: Dict[str, Any]):
+    """Bekleyen güncelleme kalmayana kadar mesajı aralıklarla düzenle"""
+    while _edit_state.get(randy_id) is state:
+        delay = state['last_edit'] + RANDY_EDIT_INTERVAL - time.monotonic()
+
+        if not state['dirty']:
+            # Aralık dolana kadar yeni katılımları bekle; gelmezse durumu bırak
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            _edit_state.pop(randy_id, None)
+            return
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        state['dirty'] = False
+
+        try:
+            randy = await get_randy_by_id(randy_id)
+
+            if not randy or randy['status'] != 'active':
+                _edit_state.pop(randy_id, None)
+                return
+
+            count = await get_participant_count(randy_id)
+            text, keyboard = await render_randy_announcement(bot, randy, count)
+
+            # Metin değişmediyse düzenleme yapılmaz
+            if text == state['last_text']:
+                continue
+
+            state['last_edit'] = time.monotonic()
+            await edit_randy_announcement(
+                bot, randy, state['chat_id'], state['message_id'], text, keyboard
+            )
+
+        except RetryAfter as e:
+            # Flood limiti - bekleyip son durumu tekrar dene
+            state['dirty'] = True
+            state['last_edit'] = time.monotonic() + e.retry_after
+
+        except TelegramError as e:
+            print(f"⚠️ Randy mesajı güncellenemedi: {e}")
+
+        except Exception as e:
+            print(f"❌ Randy mesaj güncelleme hatası: {e}")
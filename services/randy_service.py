@@ -3,17 +3,57 @@
 Randy oluşturma, başlatma, katılım ve sonlandırma işlemleri
 """
 
-import random
+import asyncio
+import hashlib
 from datetime import datetime
 from typing import Optional, Dict, Any, List, Tuple
 from database import db
 from services.message_service import get_user_stats, check_message_requirement
+from utils.member_check import check_memberships
+from utils.chat_info import get_chat_info
 
 # Status tipleri
 STATUS_DRAFT = 'draft'
 STATUS_ACTIVE = 'active'
 STATUS_ENDED = 'ended'
 
+# Aktif Randy kaydı (grup bazlı) - başlatma/bitirme/güncellemede yazılır
+# {group_id: {"id", "requirement_type", "winner_count"}} - None: grupta aktif Randy yok
+_active_randy: Dict[int, Optional[Dict[str, Any]]] = {}
+
+# Bekleyen post_randy mesaj sayıları - flush_post_randy_counts ile toplu yazılır
+# {(randy_id, telegram_id): delta}
+_pending_post_randy: Dict[Tuple[int, int], int] = {}
+_post_randy_flush_lock = asyncio.Lock()
+
+# Başlatma kilitleri (grup bazlı) - eşzamanlı /randy ile aynı grupta iki aktif Randy açılmasın
+_start_locks: Dict[int, asyncio.Lock] = {}
+
+
+async def _get_active_randy_entry(group_id: int) -> Optional[Dict[str, Any]]:
+    """Gruptaki aktif Randy kaydını döndür, bilinmiyorsa veritabanından yükle"""
+    if group_id in _active_randy:
+        return _active_randy[group_id]
+
+    async with db.pool.acquire() as conn:
+        row = await conn.fetchrow("""
+            SELECT id, requirement_type, winner_count FROM randy
+            WHERE group_id = $1 AND status = $2
+        """, group_id, STATUS_ACTIVE)
+
+    entry = dict(row) if row else None
+    _active_randy[group_id] = entry
+    return entry
+
+
+def _set_active_randy(group_id: int, randy_id: int, requirement_type: str, winner_count: int):
+    """Grubun aktif Randy kaydını yaz"""
+    _active_randy[group_id] = {
+        "id": randy_id,
+        "requirement_type": requirement_type,
+        "winner_count": winner_count
+    }
+
 # ============================================
 # TASLAK YÖNETİMİ (Özelden ayarlama)
 # ============================================
@@ -468,7 +508,9 @@ async def start_randy(group_id: int, creator_id: int, message_id: int = None) ->
         if not draft:
             return False, None
 
-        async with db.pool.acquire() as conn:
+        start_lock = _start_locks.setdefault(group_id, asyncio.Lock())
+
+        async with start_lock, db.pool.acquire() as conn:
             # Aktif Randy var mı kontrol et
             existing = await conn.fetchval("""
                 SELECT id FROM randy WHERE group_id = $1 AND status = $2
@@ -508,6 +550,11 @@ async def start_randy(group_id: int, creator_id: int, message_id: int = None) ->
 
             # NOT: Taslak silinmiyor - ayarlar kalıcı
 
+            _set_active_randy(
+                group_id, randy_id,
+                draft.get('requirement_type', 'none'), draft.get('winner_count', 1)
+            )
+
             return True, {
                 "id": randy_id,
                 "title": draft['title'],
@@ -581,60 +628,70 @@ async def join_randy(
         tuple: (Başarılı mı, Mesaj kodu)
     """
     try:
-        randy = await get_randy_by_id(randy_id)
-
-        if not randy:
-            return False, "bulunamadi"
-
-        if randy['status'] != STATUS_ACTIVE:
-            return False, "aktif_degil"
+        # post_randy şartı kesin olsun diye kullanıcının bekleyen mesaj sayısını önce yaz
+        # (bekleyen sayı yoksa veritabanına gidilmez)
+        await flush_post_randy_counts(randy_id, user_id)
 
         async with db.pool.acquire() as conn:
-            # Zaten GERÇEKTEN katılmış mı? (username veya first_name dolu olanlar gerçek katılımcı)
-            existing = await conn.fetchrow("""
-                SELECT id, username, first_name, post_randy_message_count FROM randy_participants
-                WHERE randy_id = $1 AND telegram_id = $2
+            # Randy ve kullanıcının mevcut kaydı tek sorguda
+            randy = await conn.fetchrow("""
+                SELECT r.id, r.group_id, r.status, r.requirement_type, r.required_message_count,
+                       (p.username IS NOT NULL OR p.first_name IS NOT NULL) AS already_joined,
+                       COALESCE(p.post_randy_message_count, 0) AS post_randy_message_count
+                FROM randy r
+                LEFT JOIN randy_participants p ON p.randy_id = r.id AND p.telegram_id = $2
+                WHERE r.id = $1
             """, randy_id, user_id)
 
-            # Eğer kayıt var VE username/first_name dolu ise gerçekten katılmış
-            if existing and (existing['username'] is not None or existing['first_name'] is not None):
+            if not randy:
+                return False, "bulunamadi"
+
+            if randy['status'] != STATUS_ACTIVE:
+                return False, "aktif_degil"
+
+            # username veya first_name dolu olanlar gerçek katılımcı
+            if randy['already_joined']:
                 return False, "zaten_katildi"
 
             # Kanal üyelik kontrolü - HER KATILIM DENEMESINDE YAPILIR
             # Activity group da zorunlu kanal olarak kontrol edilir
             if bot:
-                not_member_channels = []
-
-                # Önce activity group kontrolü (her zaman zorunlu)
                 from config import ACTIVITY_GROUP_ID
+
+                # Activity group (her zaman zorunlu) + eklenen zorunlu kanallar
+                required = []
                 if ACTIVITY_GROUP_ID and ACTIVITY_GROUP_ID != 0:
-                    try:
-                        member = await bot.get_chat_member(ACTIVITY_GROUP_ID, user_id)
-                        if member.status in ['left', 'kicked']:
-                            # Activity group bilgisini otomatik al
-                            try:
-                                activity_chat = await bot.get_chat(ACTIVITY_GROUP_ID)
-                                if activity_chat.username:
-                                    activity_name = f"@{activity_chat.username}"
-                                else:
-                                    activity_name = activity_chat.title or "Ana Grup"
-                            except:
-                                activity_name = "Ana Grup"
-                            not_member_channels.append(activity_name)
-                    except Exception:
-                        pass
-
-                # Sonra eklenen zorunlu kanalları kontrol et
-                channels = await get_randy_channels(randy_id)
+                    required.append((ACTIVITY_GROUP_ID, None))
+
+                channels = await conn.fetch("""
+                    SELECT channel_id, channel_username, channel_title
+                    FROM randy_channels WHERE randy_id = $1
+                    ORDER BY created_at
+                """, randy_id)
                 for channel in channels:
-                    try:
-                        member = await bot.get_chat_member(channel['channel_id'], user_id)
-                        if member.status in ['left', 'kicked']:
-                            channel_name = f"@{channel['channel_username']}" if channel['channel_username'] else channel['channel_title']
-                            not_member_channels.append(channel_name)
-                    except Exception:
-                        # Kanal kontrolü başarısız, atla
-                        pass
+                    channel_name = f"@{channel['channel_username']}" if channel['channel_username'] else channel['channel_title']
+                    required.append((channel['channel_id'], channel_name))
+
+                # Tüm kanallar eşzamanlı kontrol edilir
+                memberships = await check_memberships(bot, user_id, [chat_id for chat_id, _ in required])
+
+                not_member_channels = []
+                for chat_id, channel_name in required:
+                    if memberships.get(chat_id, True):
+                        continue
+
+                    if channel_name is None:
+                        # Activity group bilgisini otomatik al
+                        try:
+                            activity_chat = await get_chat_info(bot, chat_id)
+                            if activity_chat.username:
+                                channel_name = f"@{activity_chat.username}"
+                            else:
+                                channel_name = activity_chat.title or "Ana Grup"
+                        except:
+                            channel_name = "Ana Grup"
+
+                    not_member_channels.append(channel_name)
 
                 if not_member_channels:
                     return False, f"kanal_uyesi_degil:{', '.join(not_member_channels)}"
@@ -646,9 +703,7 @@ async def join_randy(
 
                 if req_type == 'post_randy':
                     # Randy sonrası mesaj kontrolü - mevcut kaydı kontrol et
-                    current_count = 0
-                    if existing:
-                        current_count = existing['post_randy_message_count'] or 0
+                    current_count = randy['post_randy_message_count']
 
                     if current_count < req_count:
                         return False, f"post_randy:{req_count}:{current_count}"
@@ -662,20 +717,54 @@ async def join_randy(
                     if not met:
                         return False, f"mesaj_sarti:{req_type}:{req_count}:{current}"
 
-            # Katılımcı ekle veya güncelle (username ve first_name ile GERÇEK katılımcı yap)
-            if existing:
-                # Mevcut kaydı güncelle - artık gerçek katılımcı
-                await conn.execute("""
-                    UPDATE randy_participants
-                    SET username = $1, first_name = $2
-                    WHERE randy_id = $3 AND telegram_id = $4
-                """, username, first_name, randy_id, user_id)
-            else:
-                # Yeni kayıt ekle
-                await conn.execute("""
+            # Katılımcı ekle veya yer tutucu kaydı GERÇEK katılımcı yap - tek sorgu
+            # Zaten katılmış kayıt güncellenmez (satır dönmez); sayaç aynı sorguda artırılır
+            # post_randy şartı çakışma anında tekrar doğrulanır
+            min_post_count = 0
+            if randy['requirement_type'] == 'post_randy':
+                min_post_count = randy['required_message_count'] or 0
+
+            # Başarısızlık sebebi (Randy bitti / post_randy şartı / zaten katıldı)
+            # aynı sorgunun anlık görüntüsünden okunur
+            result = await conn.fetchrow("""
+                WITH current AS (
+                    -- Bitirme (FOR UPDATE) ile yarışmamak için satır kilitlenir;
+                    -- bitirme commit ettiyse güncel status okunur
+                    SELECT id, status FROM randy WHERE id = $1 FOR SHARE
+                ), joined AS (
                     INSERT INTO randy_participants (randy_id, telegram_id, username, first_name)
-                    VALUES ($1, $2, $3, $4)
-                """, randy_id, user_id, username, first_name)
+                    SELECT id, $2, $3, $4 FROM current WHERE status = $5
+                    ON CONFLICT (randy_id, telegram_id)
+                    DO UPDATE SET username = EXCLUDED.username, first_name = EXCLUDED.first_name
+                    WHERE randy_participants.username IS NULL
+                    AND randy_participants.first_name IS NULL
+                    AND COALESCE(randy_participants.post_randy_message_count, 0) >= $6
+                    RETURNING telegram_id
+                ), counted AS (
+                    UPDATE randy SET participant_count = participant_count + 1
+                    WHERE id = $1 AND status = $5 AND EXISTS (SELECT 1 FROM joined)
+                    RETURNING participant_count
+                )
+                SELECT (SELECT status FROM current) AS status,
+                       (SELECT participant_count FROM counted) AS participant_count,
+                       (SELECT COALESCE(post_randy_message_count, 0) FROM randy_participants
+                        WHERE randy_id = $1 AND telegram_id = $2) AS post_randy_message_count
+            """, randy_id, user_id, username, first_name, STATUS_ACTIVE, min_post_count)
+
+            if result['participant_count'] is None:
+                # Okuma ile yazma arasında Randy bitirildi
+                if result['status'] is None:
+                    return False, "bulunamadi"
+                if result['status'] != STATUS_ACTIVE:
+                    return False, "aktif_degil"
+
+                # post_randy şartı çakışma anında karşılanmadı
+                current_count = result['post_randy_message_count'] or 0
+                if current_count < min_post_count:
+                    return False, f"post_randy:{min_post_count}:{current_count}"
+
+                # Aynı anda gelen ikinci tıklama / tekrar deneme
+                return False, "zaten_katildi"
 
             return True, "basarili"
 
@@ -685,12 +774,11 @@ async def join_randy(
 
 
 async def get_participant_count(randy_id: int) -> int:
-    """Randy katılımcı sayısını getir"""
+    """Randy katılımcı sayısını getir (katılımda güncellenen sayaçtan)"""
     try:
         async with db.pool.acquire() as conn:
             count = await conn.fetchval("""
-                SELECT COUNT(*) FROM randy_participants
-                WHERE randy_id = $1 AND (username IS NOT NULL OR first_name IS NOT NULL)
+                SELECT participant_count FROM randy WHERE id = $1
             """, randy_id)
             return count or 0
 
@@ -699,55 +787,143 @@ async def get_participant_count(randy_id: int) -> int:
         return 0
 
 
-async def end_randy(randy_id: int) -> Tuple[bool, List[Dict]]:
+def make_draw_seed(randy_id: int, ended_at: datetime, participants_digest: str) -> str:
     """
-    Randy'yi sonlandır ve kazananları seç
+    Çekiliş seed'ini üret
+
+    Args:
+        randy_id: Randy ID
+        ended_at: Bitiş zamanı (randy.ended_at ile aynı değer)
+        participants_digest: Katılımcı ID'lerinin (sıralı, virgülle ayrılmış) md5 özeti
+
+    Returns:
+        str: Hex seed
+    """
+    raw = f"{randy_id}:{ended_at.isoformat()}:{participants_digest}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def draw_rank(seed: str, telegram_id: int) -> str:
+    """
+    Katılımcının çekiliş sıra anahtarı
+
+    Anahtar = sha256("<seed>:<telegram_id>") (UTF-8, hex). Kazananlar anahtarı en
+    küçük olan winner_count katılımcıdır; çekiliş sırası da anahtar sırasıdır.
+    Sadece SHA-256'ya dayandığı için herhangi bir dil/araçla çevrimdışı
+    doğrulanabilir (bkz. pick_winners). Veritabanındaki seçim aynı formülü kullanır.
+
+    Args:
+        seed: Çekiliş seed'i (randy.draw_seed)
+        telegram_id: Katılımcı ID
+
+    Returns:
+        str: Hex sıra anahtarı
+    """
+    return hashlib.sha256(f"{seed}:{telegram_id}".encode("utf-8")).hexdigest()
+
+
+def pick_winners(seed: str, telegram_ids: List[int], winner_count: int) -> List[int]:
+    """
+    Seed'den kazananları seç (çevrimdışı doğrulama için referans uygulama)
+
+    Args:
+        seed: Çekiliş seed'i
+        telegram_ids: Katılımcı ID'leri
+        winner_count: Kazanan sayısı
+
+    Returns:
+        list: Çekiliş sırasıyla kazanan ID'leri
+    """
+    ranked = sorted(telegram_ids, key=lambda tid: (draw_rank(seed, tid), tid))
+    return ranked[:winner_count]
+
+
+async def _end_randy_and_draw(randy_id: int, winner_count: int = None, allow_fewer: bool = False) -> Tuple[bool, List[Dict]]:
+    """
+    Randy'yi tek transaction içinde sonlandır ve kazananları seç
+
+    Randy satırı kilitlenir (aynı Randy iki kez bitirilemez). Seed, Randy ID +
+    bitiş zamanı + katılımcı kümesi özetinden üretilip randy.draw_seed'e yazılır;
+    kazananlar bu seed ile draw_rank anahtarı en küçük katılımcılardır.
+
+    Args:
+        randy_id: Randy ID
+        winner_count: Kazanan sayısı (None ise Randy'nin kendi sayısı)
+        allow_fewer: True ise katılımcı azsa hepsi kazanır, False ise kazanan seçilmez
 
     Returns:
         tuple: (Başarılı mı, Kazananlar listesi)
     """
-    try:
-        randy = await get_randy_by_id(randy_id)
+    async with db.pool.acquire() as conn:
+        async with conn.transaction():
+            randy = await conn.fetchrow("""
+                SELECT id, group_id, status, winner_count
+                FROM randy WHERE id = $1
+                FOR UPDATE
+            """, randy_id)
 
-        if not randy:
-            return False, []
+            if not randy or randy['status'] != STATUS_ACTIVE:
+                return False, []
 
-        if randy['status'] != STATUS_ACTIVE:
-            return False, []
+            if winner_count is None:
+                winner_count = randy['winner_count']
 
-        async with db.pool.acquire() as conn:
-            # Geçerli katılımcıları getir
-            participants = await conn.fetch("""
-                SELECT telegram_id, username, first_name
+            # Katılımcı kümesinin özeti (ID'ler veritabanından taşınmaz)
+            summary = await conn.fetchrow("""
+                SELECT COUNT(*) AS cnt,
+                       md5(COALESCE(string_agg(telegram_id::text, ',' ORDER BY telegram_id), '')) AS digest
                 FROM randy_participants
                 WHERE randy_id = $1 AND (username IS NOT NULL OR first_name IS NOT NULL)
             """, randy_id)
 
-            participants = [dict(p) for p in participants]
+            participant_count = summary['cnt']
 
-            if len(participants) < randy['winner_count']:
+            if participant_count < winner_count and not allow_fewer:
                 # Yeterli katılımcı yok
-                await conn.execute("""
-                    UPDATE randy SET status = $1, ended_at = NOW() WHERE id = $2
-                """, STATUS_ENDED, randy_id)
-                return True, []
+                winner_count = 0
 
-            # Kazananları rastgele seç
-            winners = random.sample(participants, randy['winner_count'])
+            ended_at = datetime.utcnow()
+            seed = make_draw_seed(randy_id, ended_at, summary['digest'])
+            winner_count = min(winner_count, participant_count)
 
-            # Kazananları kaydet
-            for winner in winners:
-                await conn.execute("""
+            winners = []
+            if winner_count > 0:
+                # draw_rank ile aynı formül: sha256("<seed>:<telegram_id>") en küçükler
+                rows = await conn.fetch("""
                     INSERT INTO randy_winners (randy_id, telegram_id, username, first_name)
-                    VALUES ($1, $2, $3, $4)
-                """, randy_id, winner['telegram_id'], winner.get('username'), winner.get('first_name'))
-
-            # Randy'yi sonlandır
+                    SELECT randy_id, telegram_id, username, first_name
+                    FROM randy_participants
+                    WHERE randy_id = $1 AND (username IS NOT NULL OR first_name IS NOT NULL)
+                    ORDER BY sha256(convert_to($2 || ':' || telegram_id::text, 'UTF8')), telegram_id
+                    LIMIT $3
+                    RETURNING telegram_id, username, first_name
+                """, randy_id, seed, winner_count)
+
+                # RETURNING sırası garanti değil - çekiliş sırasını yeniden kur
+                winners = sorted(
+                    (dict(r) for r in rows),
+                    key=lambda w: (draw_rank(seed, w['telegram_id']), w['telegram_id'])
+                )
+
+            # Randy'yi sonlandır (seed ile birlikte)
             await conn.execute("""
-                UPDATE randy SET status = $1, ended_at = NOW() WHERE id = $2
-            """, STATUS_ENDED, randy_id)
+                UPDATE randy SET status = $1, ended_at = $2, draw_seed = $3 WHERE id = $4
+            """, STATUS_ENDED, ended_at, seed, randy_id)
 
-            return True, winners
+    _active_randy[randy['group_id']] = None
+    return True, winners
+
+
+async def end_randy(randy_id: int) -> Tuple[bool, List[Dict]]:
+    """
+    Randy'yi sonlandır ve kazananları seç
+    Katılımcı sayısı kazanandan azsa kazanan seçilmez
+
+    Returns:
+        tuple: (Başarılı mı, Kazananlar listesi)
+    """
+    try:
+        return await _end_randy_and_draw(randy_id)
 
     except Exception as e:
         print(f"❌ Randy sonlandırma hatası: {e}")
@@ -767,47 +943,7 @@ async def end_randy_with_count(randy_id: int, winner_count: int) -> Tuple[bool,
         tuple: (Başarılı mı, Kazananlar listesi)
     """
     try:
-        randy = await get_randy_by_id(randy_id)
-
-        if not randy:
-            return False, []
-
-        if randy['status'] != STATUS_ACTIVE:
-            return False, []
-
-        async with db.pool.acquire() as conn:
-            # Geçerli katılımcıları getir
-            participants = await conn.fetch("""
-                SELECT telegram_id, username, first_name
-                FROM randy_participants
-                WHERE randy_id = $1 AND (username IS NOT NULL OR first_name IS NOT NULL)
-            """, randy_id)
-
-            participants = [dict(p) for p in participants]
-
-            # Randy'yi sonlandır
-            await conn.execute("""
-                UPDATE randy SET status = $1, ended_at = NOW() WHERE id = $2
-            """, STATUS_ENDED, randy_id)
-
-            if len(participants) == 0:
-                # Hiç katılımcı yok
-                return True, []
-
-            # Kazanan sayısını katılımcı sayısıyla sınırla
-            actual_winner_count = min(winner_count, len(participants))
-
-            # Kazananları rastgele seç
-            winners = random.sample(participants, actual_winner_count)
-
-            # Kazananları kaydet
-            for winner in winners:
-                await conn.execute("""
-                    INSERT INTO randy_winners (randy_id, telegram_id, username, first_name)
-                    VALUES ($1, $2, $3, $4)
-                """, randy_id, winner['telegram_id'], winner.get('username'), winner.get('first_name'))
-
-            return True, winners
+        return await _end_randy_and_draw(randy_id, winner_count, allow_fewer=True)
 
     except Exception as e:
         print(f"❌ Randy sonlandırma hatası (count): {e}")
@@ -834,43 +970,75 @@ async def track_post_randy_message(
         bool: Aktif post_randy Randy varsa True
     """
     try:
-        async with db.pool.acquire() as conn:
-            # Aktif post_randy Randy var mı?
-            randy = await conn.fetchrow("""
-                SELECT id FROM randy
-                WHERE group_id = $1 AND status = $2 AND requirement_type = 'post_randy'
-            """, group_id, STATUS_ACTIVE)
+        # Aktif post_randy Randy var mı? (kayıttan - çoğu mesajda veritabanına gidilmez)
+        randy = await _get_active_randy_entry(group_id)
 
-            if not randy:
-                return False
+        if not randy or randy['requirement_type'] != 'post_randy':
+            return False
 
-            # Kullanıcı kaydı var mı?
-            existing = await conn.fetchrow("""
-                SELECT id, username, first_name FROM randy_participants
-                WHERE randy_id = $1 AND telegram_id = $2
-            """, randy['id'], user_id)
+        # Veritabanına yazılmaz; flush_post_randy_counts toplu olarak yazar
+        # username/first_name'e dokunulmaz (gerçek katılımcı değilse NULL kalmalı)
+        key = (randy['id'], user_id)
+        _pending_post_randy[key] = _pending_post_randy.get(key, 0) + 1
 
-            if existing:
-                # Mevcut kayıt var, sadece mesaj sayısını artır
-                # username/first_name'i DEĞİŞTİRME (gerçek katılımcı değilse NULL kalmalı)
-                await conn.execute("""
-                    UPDATE randy_participants
-                    SET post_randy_message_count = post_randy_message_count + 1
-                    WHERE randy_id = $1 AND telegram_id = $2
-                """, randy['id'], user_id)
-            else:
-                # Yeni kayıt oluştur - AMA username ve first_name NULL (henüz gerçek katılımcı değil)
-                await conn.execute("""
-                    INSERT INTO randy_participants (randy_id, telegram_id, username, first_name, post_randy_message_count)
-                    VALUES ($1, $2, NULL, NULL, 1)
-                """, randy['id'], user_id)
-
-            return True
+        return True
 
     except Exception as e:
         print(f"❌ Post-Randy mesaj takip hatası: {e}")
         return False
 
+async def flush_post_randy_counts(randy_id: int = None, user_id: int = None) -> int:
+    """
+    Bekleyen post_randy mesaj sayılarını toplu yaz
+
+    Args:
+        randy_id: Sadece bu kullanıcının sayısını yazmak için Randy ID (opsiyonel)
+        user_id: Sadece bu kullanıcının sayısını yazmak için kullanıcı ID (opsiyonel)
+
+    Returns:
+        int: Yazılan kayıt sayısı
+    """
+    global _pending_post_randy
+
+    async with _post_randy_flush_lock:
+        if randy_id is not None and user_id is not None:
+            delta = _pending_post_randy.pop((randy_id, user_id), 0)
+            batch = {(randy_id, user_id): delta} if delta else {}
+        else:
+            batch = _pending_post_randy
+            _pending_post_randy = {}
+
+        if not batch:
+            return 0
+
+        randy_ids = [key[0] for key in batch]
+        user_ids = [key[1] for key in batch]
+        deltas = list(batch.values())
+
+        try:
+            async with db.pool.acquire() as conn:
+                # Yeni kayıtlar gerçek katılımcı değildir (username ve first_name NULL)
+                # Silinmiş Randy'lere ait sayılar JOIN ile elenir
+                await conn.execute("""
+                    INSERT INTO randy_participants (randy_id, telegram_id, username, first_name, post_randy_message_count)
+                    SELECT t.randy_id, t.user_id, NULL, NULL, t.delta
+                    FROM unnest($1::int[], $2::bigint[], $3::int[]) AS t(randy_id, user_id, delta)
+                    JOIN randy r ON r.id = t.randy_id
+                    ON CONFLICT (randy_id, telegram_id)
+                    DO UPDATE SET post_randy_message_count =
+                        randy_participants.post_randy_message_count + EXCLUDED.post_randy_message_count
+                """, randy_ids, user_ids, deltas)
+
+            return len(batch)
+
+        except Exception as e:
+            print(f"❌ Post-Randy sayı yazma hatası: {e}")
+            # Sayılar kaybolmasın - bir sonraki yazımda tekrar denenir
+            for key, delta in batch.items():
+                _pending_post_randy[key] = _pending_post_randy.get(key, 0) + delta
+            return 0
+
+
 async def update_randy_message_id(randy_id: int, message_id: int) -> bool:
     """Randy mesaj ID'sini güncelle"""
     try:
@@ -901,6 +1069,11 @@ async def update_randy_winner_count(randy_id: int, winner_count: int) -> bool:
             await conn.execute("""
                 UPDATE randy SET winner_count = $1 WHERE id = $2 AND status = 'active'
             """, winner_count, randy_id)
+
+            for entry in _active_randy.values():
+                if entry and entry['id'] == randy_id:
+                    entry['winner_count'] = winner_count
+
             return True
 
     except Exception as e:
@@ -991,3 +1164,53 @@ async def update_group_admin(group_id: int, user_id: int, is_admin: bool) -> boo
     except Exception as e:
         print(f"❌ Admin güncelleme hatası: {e}")
         return False
+
+
+async def get_active_group_ids() -> List[int]:
+    """Botun aktif olduğu grupların ID'lerini getir"""
+    try:
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT group_id FROM telegram_groups WHERE is_active = TRUE
+            """)
+            return [row['group_id'] for row in rows]
+
+    except Exception as e:
+        print(f"❌ Aktif grup listesi hatası: {e}")
+        return []
+
+
+async def replace_group_admins(group_id: int, admin_ids: List[int]) -> bool:
+    """
+    Grubun admin kayıtlarını güncel admin listesiyle toplu değiştir
+
+    Args:
+        group_id: Grup ID
+        admin_ids: Güncel admin kullanıcı ID'leri
+
+    Returns:
+        bool: Başarılı ise True
+    """
+    try:
+        async with db.pool.acquire() as conn:
+            async with conn.transaction():
+                # Artık admin olmayanlar
+                await conn.execute("""
+                    UPDATE group_admins SET is_admin = FALSE, updated_at = NOW()
+                    WHERE group_id = $1 AND is_admin = TRUE AND NOT (user_id = ANY($2::bigint[]))
+                """, group_id, admin_ids)
+
+                # Güncel adminler
+                await conn.execute("""
+                    INSERT INTO group_admins (group_id, user_id, is_admin, updated_at)
+                    SELECT $1, u.user_id, TRUE, NOW()
+                    FROM unnest($2::bigint[]) AS u(user_id)
+                    ON CONFLICT (group_id, user_id)
+                    DO UPDATE SET is_admin = TRUE, updated_at = NOW()
+                """, group_id, admin_ids)
+
+            return True
+
+    except Exception as e:
+        print(f"❌ Admin listesi kaydetme hatası: {e}")
+        return False
@@ -3,6 +3,9 @@
 Roll oturumları, adımlar ve kullanıcı takibi
 """
 
+import asyncio
+import functools
+import heapq
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List, Tuple
 from database import db
@@ -18,9 +21,161 @@ STATUS_LOCKED = 'locked'
 STATUS_LOCKED_BREAK = 'locked_break'
 
 
+# Roll durumu cache'i (grup bazlı) - her durum geçişinde yeniden yazılır
+# {group_id: {"session_id", "status", "active_duration", "current_step", "previous_status", "step_id"}}
+_roll_cache: Dict[int, Dict[str, Any]] = {}
+
+# Durum geçişi kilitleri (grup bazlı) - güncellemeler eşzamanlı işlendiği için
+# aynı grubun roll komutları ve cache yüklemesi sırayla çalışır
+_roll_locks: Dict[int, asyncio.Lock] = {}
+
+# Bekleyen roll aktivitesi (adım bazlı) - flush_roll_activity ile toplu yazılır
+# {step_id: {user_id: {"count", "name", "last_active", "can_insert"}}}
+_pending_roll_activity: Dict[int, Dict[int, Dict[str, Any]]] = {}
+_roll_flush_lock = asyncio.Lock()
+
+# İnaktif kullanıcı tahliye indeksi (grup bazlı)
+# {group_id: {"session_id", "heap": [(last_active, step_id, user_id)], "last_active": {(step_id, user_id): last_active}}}
+# Heap'teki eski kayıtlar silinmez; "last_active" ile eşleşmeyen kayıtlar pop sırasında atlanır
+_eviction_index: Dict[int, Dict[str, Any]] = {}
+
+# Tahliyenin çalıştığı durumlar
+TRACKED_STATUSES = (STATUS_ACTIVE, STATUS_LOCKED, STATUS_LOCKED_BREAK)
+
+
+def _roll_lock(group_id: int) -> asyncio.Lock:
+    """Grubun roll durum kilidi"""
+    lock = _roll_locks.get(group_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _roll_locks[group_id] = lock
+    return lock
+
+
+def _serialized(func):
+    """Aynı grubun durum geçişlerini sırayla çalıştır (ilk argüman group_id)"""
+    @functools.wraps(func)
+    async def wrapper(group_id: int, *args, **kwargs):
+        async with _roll_lock(group_id):
+            return await func(group_id, *args, **kwargs)
+    return wrapper
+
+
+async def _refresh_roll_cache(conn, group_id: int) -> Dict[str, Any]:
+    """Roll durumunu veritabanından okuyup cache'e yaz"""
+    row = await conn.fetchrow("""
+        SELECT s.id, s.status, s.active_duration, s.current_step, s.previous_status,
+               st.id AS step_id
+        FROM roll_sessions s
+        LEFT JOIN roll_steps st ON st.session_id = s.id AND st.is_active = TRUE
+        WHERE s.group_id = $1
+        LIMIT 1
+    """, group_id)
+
+    if not row:
+        state = {
+            'session_id': None,
+            'status': STATUS_STOPPED,
+            'active_duration': DEFAULT_ROLL_DURATION,
+            'current_step': 0,
+            'previous_status': None,
+            'step_id': None
+        }
+    else:
+        state = {
+            'session_id': row['id'],
+            'status': row['status'],
+            'active_duration': row['active_duration'],
+            'current_step': row['current_step'],
+            'previous_status': row['previous_status'],
+            'step_id': row['step_id']
+        }
+
+    _roll_cache[group_id] = state
+
+    if state['session_id'] and state['status'] != STATUS_STOPPED:
+        await _load_eviction_index(conn, group_id, state['session_id'])
+    else:
+        _eviction_index.pop(group_id, None)
+
+    return state
+
+
+async def _load_eviction_index(conn, group_id: int, session_id: int):
+    """Session'daki tüm adım kullanıcılarının son aktiflik zamanlarını indekse yükle"""
+    rows = await conn.fetch("""
+        SELECT u.step_id, u.telegram_user_id, u.last_active
+        FROM roll_step_users u
+        JOIN roll_steps rs ON rs.id = u.step_id
+        WHERE rs.session_id = $1
+    """, session_id)
+
+    previous = _eviction_index.get(group_id)
+    known = previous['last_active'] if previous and previous['session_id'] == session_id else {}
+
+    last_active = {}
+    for row in rows:
+        key = (row['step_id'], row['telegram_user_id'])
+        ts = row['last_active']
+        # Henüz yazılmamış daha yeni aktivite geri alınmasın
+        known_ts = known.get(key)
+        if known_ts is not None and known_ts > ts:
+            ts = known_ts
+        last_active[key] = ts
+
+    # Veritabanına henüz eklenmemiş (bekleyen) kullanıcılar korunur
+    for key, ts in known.items():
+        if key not in last_active and key[1] in _pending_roll_activity.get(key[0], {}):
+            last_active[key] = ts
+
+    heap = [(ts, step_id, user_id) for (step_id, user_id), ts in last_active.items()]
+    heapq.heapify(heap)
+
+    _eviction_index[group_id] = {
+        'session_id': session_id,
+        'heap': heap,
+        'last_active': last_active
+    }
+
+
+def _touch_eviction_index(group_id: int, step_id: int, user_id: int, last_active: datetime, can_insert: bool):
+    """Kullanıcının son aktiflik zamanını indekste güncelle"""
+    index = _eviction_index.get(group_id)
+    if index is None:
+        return
+
+    key = (step_id, user_id)
+    # Kilitli durumlarda listede olmayan kullanıcı indekse de girmez
+    if not can_insert and key not in index['last_active']:
+        return
+
+    index['last_active'][key] = last_active
+    heapq.heappush(index['heap'], (last_active, step_id, user_id))
+
+    # Geçersiz kayıtlar birikirse heap'i yeniden kur
+    if len(index['heap']) > 2 * len(index['last_active']) + 64:
+        index['heap'] = [(ts, s_id, u_id) for (s_id, u_id), ts in index['last_active'].items()]
+        heapq.heapify(index['heap'])
+
+
+async def _get_cached_state(group_id: int) -> Dict[str, Any]:
+    """Cache'deki roll durumunu döndür, yoksa veritabanından yükle"""
+    state = _roll_cache.get(group_id)
+
+    if state is None:
+        # Yükleme, eşzamanlı bir geçişin yazdığı cache'i eski veriyle ezmesin
+        async with _roll_lock(group_id):
+            state = _roll_cache.get(group_id)
+            if state is None:
+                async with db.pool.acquire() as conn:
+                    state = await _refresh_roll_cache(conn, group_id)
+
+    return state
+
+
 async def get_roll_state(group_id: int) -> Dict[str, Any]:
     """
-    Roll durumunu getir
+    Roll durumunu getir (cache'den - veritabanına sadece ilk okumada gidilir)
 
     Args:
         group_id: Grup ID
@@ -29,29 +184,15 @@ async def get_roll_state(group_id: int) -> Dict[str, Any]:
         dict: Roll durumu
     """
     try:
-        async with db.pool.acquire() as conn:
-            session = await conn.fetchrow("""
-                SELECT status, active_duration, current_step, previous_status
-                FROM roll_sessions
-                WHERE group_id = $1
-            """, group_id)
+        state = await _get_cached_state(group_id)
 
-            if not session:
-                return {
-                    'status': STATUS_STOPPED,
-                    'active_duration': DEFAULT_ROLL_DURATION,
-                    'current_step': 0,
-                    'previous_status': None,
-                    'group_id': group_id
-                }
-
-            return {
-                'status': session['status'],
-                'active_duration': session['active_duration'],
-                'current_step': session['current_step'],
-                'previous_status': session['previous_status'],
-                'group_id': group_id
-            }
+        return {
+            'status': state['status'],
+            'active_duration': state['active_duration'],
+            'current_step': state['current_step'],
+            'previous_status': state['previous_status'],
+            'group_id': group_id
+        }
 
     except Exception as e:
         print(f"❌ Roll state getirme hatası: {e}")
@@ -64,6 +205,7 @@ async def get_roll_state(group_id: int) -> Dict[str, Any]:
         }
 
 
+@_serialized
 async def start_roll(group_id: int, duration: int) -> bool:
     """
     Roll başlat - Adım 1'i oluştur ve aktif yap
@@ -96,14 +238,18 @@ async def start_roll(group_id: int, duration: int) -> bool:
                     VALUES ($1, 1, TRUE)
                 """, session_id)
 
-                print(f"✅ Roll başlatıldı: Grup={group_id}, Süre={duration}dk")
-                return True
+            await _refresh_roll_cache(conn, group_id)
+
+            print(f"✅ Roll başlatıldı: Grup={group_id}, Süre={duration}dk")
+            return True
 
     except Exception as e:
         print(f"❌ Roll başlatma hatası: {e}")
+        _roll_cache.pop(group_id, None)
         return False
 
 
+@_serialized
 async def pause_roll(group_id: int) -> bool:
     """Roll'u duraklat"""
     try:
@@ -126,13 +272,16 @@ async def pause_roll(group_id: int) -> bool:
                     WHERE id = $2
                 """, STATUS_PAUSED, session['id'])
 
+            await _refresh_roll_cache(conn, group_id)
             return True
 
     except Exception as e:
         print(f"❌ Roll duraklatma hatası: {e}")
+        _roll_cache.pop(group_id, None)
         return False
 
 
+@_serialized
 async def lock_roll(group_id: int) -> Tuple[bool, str]:
     """
     Roll'u kilitle (yeni kullanıcı girişini kapat)
@@ -167,13 +316,16 @@ async def lock_roll(group_id: int) -> Tuple[bool, str]:
                     WHERE id = $2
                 """, STATUS_LOCKED_BREAK, session['id'])
 
+            await _refresh_roll_cache(conn, group_id)
             return True, "molada" if was_break else "normal"
 
     except Exception as e:
         print(f"❌ Roll kilitleme hatası: {e}")
+        _roll_cache.pop(group_id, None)
         return False, "hata"
 
 
+@_serialized
 async def unlock_roll(group_id: int) -> Tuple[bool, str]:
     """
     Roll kilidini aç
@@ -197,6 +349,7 @@ async def unlock_roll(group_id: int) -> Tuple[bool, str]:
                     SET status = $1, previous_status = NULL, updated_at = NOW()
                     WHERE id = $2
                 """, prev_status, session['id'])
+                await _refresh_roll_cache(conn, group_id)
                 return True, prev_status
 
             elif session['status'] == STATUS_LOCKED_BREAK:
@@ -205,15 +358,18 @@ async def unlock_roll(group_id: int) -> Tuple[bool, str]:
                     SET status = $1, updated_at = NOW()
                     WHERE id = $2
                 """, STATUS_BREAK, session['id'])
+                await _refresh_roll_cache(conn, group_id)
                 return True, STATUS_BREAK
 
             return False, ""
 
     except Exception as e:
         print(f"❌ Roll kilit açma hatası: {e}")
+        _roll_cache.pop(group_id, None)
         return False, ""
 
 
+@_serialized
 async def start_break(group_id: int) -> Tuple[bool, str]:
     """
     Mola başlat
@@ -259,13 +415,16 @@ async def start_break(group_id: int) -> Tuple[bool, str]:
                 )
             """, group_id)
 
+            await _refresh_roll_cache(conn, group_id)
             return True, "kilitli" if was_locked else "normal"
 
     except Exception as e:
         print(f"❌ Mola başlatma hatası: {e}")
+        _roll_cache.pop(group_id, None)
         return False, "hata"
 
 
+@_serialized
 async def resume_roll(group_id: int) -> Tuple[bool, str, int]:
     """
     Moladan devam et / Yeni adım oluştur
@@ -295,6 +454,7 @@ async def resume_roll(group_id: int) -> Tuple[bool, str, int]:
 
                 # LastActive güncelle
                 await _update_all_last_active(conn, group_id)
+                await _refresh_roll_cache(conn, group_id)
 
                 return True, new_status, duration
 
@@ -306,6 +466,7 @@ async def resume_roll(group_id: int) -> Tuple[bool, str, int]:
                 """, STATUS_LOCKED, session['id'])
 
                 await _update_all_last_active(conn, group_id)
+                await _refresh_roll_cache(conn, group_id)
 
                 return True, STATUS_LOCKED, duration
 
@@ -334,6 +495,7 @@ async def resume_roll(group_id: int) -> Tuple[bool, str, int]:
                     """, STATUS_ACTIVE, new_step, session['id'])
 
                 await _update_all_last_active(conn, group_id)
+                await _refresh_roll_cache(conn, group_id)
 
                 return True, STATUS_ACTIVE, duration
 
@@ -341,9 +503,11 @@ async def resume_roll(group_id: int) -> Tuple[bool, str, int]:
 
     except Exception as e:
         print(f"❌ Roll devam hatası: {e}")
+        _roll_cache.pop(group_id, None)
         return False, "", 0
 
 
+@_serialized
 async def save_step(group_id: int) -> Tuple[bool, str, int]:
     """
     Adım kaydet - Mevcut aktif adımı kapat
@@ -352,6 +516,9 @@ async def save_step(group_id: int) -> Tuple[bool, str, int]:
         tuple: (Başarılı mı, Mesaj, Adım numarası)
     """
     try:
+        # Listeler kesin olsun diye bekleyen aktiviteyi önce yaz
+        await flush_roll_activity()
+
         async with db.pool.acquire() as conn:
             session = await conn.fetchrow("""
                 SELECT id, status, active_duration, current_step
@@ -371,7 +538,10 @@ async def save_step(group_id: int) -> Tuple[bool, str, int]:
                 return False, "adim_yok", 0
 
             # Önce inaktif kullanıcıları temizle
-            if session['status'] in [STATUS_ACTIVE, STATUS_LOCKED, STATUS_LOCKED_BREAK]:
+            if session['status'] in TRACKED_STATUSES:
+                # Kilit bizde; cache boşsa clean_inactive_users kilidi tekrar beklemesin
+                if group_id not in _roll_cache:
+                    await _refresh_roll_cache(conn, group_id)
                 await clean_inactive_users(group_id)
 
             # Kullanıcı sayısını kontrol et
@@ -392,13 +562,16 @@ async def save_step(group_id: int) -> Tuple[bool, str, int]:
                     UPDATE roll_sessions SET status = $1, updated_at = NOW() WHERE id = $2
                 """, STATUS_PAUSED, session['id'])
 
+            await _refresh_roll_cache(conn, group_id)
             return True, "kaydedildi", step['step_number']
 
     except Exception as e:
         print(f"❌ Adım kaydetme hatası: {e}")
+        _roll_cache.pop(group_id, None)
         return False, "hata", 0
 
 
+@_serialized
 async def stop_roll(group_id: int) -> bool:
     """Roll'u sonlandır"""
     try:
@@ -407,10 +580,12 @@ async def stop_roll(group_id: int) -> bool:
                 UPDATE roll_sessions SET status = $1, updated_at = NOW()
                 WHERE group_id = $2
             """, STATUS_STOPPED, group_id)
+            await _refresh_roll_cache(conn, group_id)
             return True
 
     except Exception as e:
         print(f"❌ Roll durdurma hatası: {e}")
+        _roll_cache.pop(group_id, None)
         return False
 
 
@@ -433,106 +608,240 @@ async def track_user_message(
         bool: Başarılı ise True
     """
     try:
-        async with db.pool.acquire() as conn:
-            session = await conn.fetchrow("""
-                SELECT id, status, active_duration FROM roll_sessions
-                WHERE group_id = $1
-            """, group_id)
+        # Durum ve aktif adım cache'den gelir - roll yoksa veritabanına hiç gidilmez
+        state = await _get_cached_state(group_id)
 
-            if not session:
-                return False
+        # Sadece active, locked veya locked_break'te izle
+        if state['status'] not in TRACKED_STATUSES:
+            return False
 
-            # Sadece active, locked veya locked_break'te izle
-            if session['status'] not in [STATUS_ACTIVE, STATUS_LOCKED, STATUS_LOCKED_BREAK]:
-                return False
+        step_id = state['step_id']
+        if not step_id:
+            return False
 
-            # Aktif adımı bul
-            step = await conn.fetchrow("""
-                SELECT id FROM roll_steps
-                WHERE session_id = $1 AND is_active = TRUE
-            """, session['id'])
-
-            if not step:
-                return False
+        name = f"@{username}" if username else first_name or "Kullanıcı"
 
-            name = f"@{username}" if username else first_name or "Kullanıcı"
-            now = datetime.utcnow()
+        # Veritabanına yazılmaz; flush_roll_activity toplu olarak yazar
+        step_users = _pending_roll_activity.setdefault(step_id, {})
+        entry = step_users.get(user_id)
 
-            # Kilitli durumlarda sadece mevcut kullanıcıları güncelle
-            if session['status'] in [STATUS_LOCKED, STATUS_LOCKED_BREAK]:
-                result = await conn.execute("""
-                    UPDATE roll_step_users
-                    SET last_active = $1, message_count = message_count + 1, name = $2
-                    WHERE step_id = $3 AND telegram_user_id = $4
-                """, now, name, step['id'], user_id)
+        if entry is None:
+            entry = {"count": 0, "name": name, "last_active": None, "can_insert": False}
+            step_users[user_id] = entry
 
-                # Affected rows = 0 ise kullanıcı yok (yeni kullanıcı eklenmiyor)
-                return True
+        entry["count"] += 1
+        entry["name"] = name
+        entry["last_active"] = datetime.utcnow()
+        # Kilitli durumlarda yeni kullanıcı eklenmez, sadece mevcutlar güncellenir
+        if state['status'] == STATUS_ACTIVE:
+            entry["can_insert"] = True
 
-            # Active durumda: upsert
-            await conn.execute("""
-                INSERT INTO roll_step_users (step_id, telegram_user_id, name, message_count, last_active)
-                VALUES ($1, $2, $3, 1, $4)
-                ON CONFLICT (step_id, telegram_user_id)
-                DO UPDATE SET
-                    last_active = $4,
-                    message_count = roll_step_users.message_count + 1,
-                    name = $3
-            """, step['id'], user_id, name, now)
+        _touch_eviction_index(group_id, step_id, user_id, entry["last_active"], state['status'] == STATUS_ACTIVE)
 
-            return True
+        return True
 
     except Exception as e:
         print(f"❌ Roll mesaj takip hatası: {e}")
         return False
 
 
+async def flush_roll_activity() -> int:
+    """
+    Bekleyen roll aktivitesini (mesaj sayısı, son aktiflik, isim) toplu yaz
+
+    Returns:
+        int: Yazılan kullanıcı kaydı sayısı
+    """
+    global _pending_roll_activity
+
+    async with _roll_flush_lock:
+        if not _pending_roll_activity:
+            return 0
+
+        batch = _pending_roll_activity
+        _pending_roll_activity = {}
+
+        # Aktif durumda gelenler upsert, kilitli durumda gelenler sadece update
+        insert_rows = ([], [], [], [], [])
+        update_rows = ([], [], [], [], [])
+
+        for step_id, step_users in batch.items():
+            for user_id, entry in step_users.items():
+                rows = insert_rows if entry["can_insert"] else update_rows
+                rows[0].append(step_id)
+                rows[1].append(user_id)
+                rows[2].append(entry["name"])
+                rows[3].append(entry["count"])
+                rows[4].append(entry["last_active"])
+
+        try:
+            async with db.pool.acquire() as conn:
+                async with conn.transaction():
+                    if insert_rows[0]:
+                        # Silinmiş adımlara ait kayıtlar JOIN ile elenir
+                        await conn.execute("""
+                            INSERT INTO roll_step_users (step_id, telegram_user_id, name, message_count, last_active)
+                            SELECT t.step_id, t.user_id, t.name, t.delta, t.last_active
+                            FROM unnest($1::int[], $2::bigint[], $3::text[], $4::int[], $5::timestamp[])
+                                AS t(step_id, user_id, name, delta, last_active)
+                            JOIN roll_steps rs ON rs.id = t.step_id
+                            ON CONFLICT (step_id, telegram_user_id)
+                            DO UPDATE SET
+                                last_active = GREATEST(roll_step_users.last_active, EXCLUDED.last_active),
+                                message_count = roll_step_users.message_count + EXCLUDED.message_count,
+                                name = EXCLUDED.name
+                        """, *insert_rows)
+
+                    if update_rows[0]:
+                        await conn.execute("""
+                            UPDATE roll_step_users u
+                            SET last_active = GREATEST(u.last_active, t.last_active),
+                                message_count = u.message_count + t.delta,
+                                name = t.name
+                            FROM unnest($1::int[], $2::bigint[], $3::text[], $4::int[], $5::timestamp[])
+                                AS t(step_id, user_id, name, delta, last_active)
+                            WHERE u.step_id = t.step_id AND u.telegram_user_id = t.user_id
+                        """, *update_rows)
+
+            return len(insert_rows[0]) + len(update_rows[0])
+
+        except Exception as e:
+            print(f"❌ Roll aktivite yazma hatası: {e}")
+            _restore_roll_activity(batch)
+            return 0
+
+
+def _restore_roll_activity(batch: Dict[int, Dict[int, Dict[str, Any]]]):
+    """Yazılamayan roll aktivitesini tampona geri ekle (bir sonraki flush'ta denenir)"""
+    for step_id, step_users in batch.items():
+        pending_users = _pending_roll_activity.setdefault(step_id, {})
+
+        for user_id, old in step_users.items():
+            entry = pending_users.get(user_id)
+
+            if entry is None:
+                pending_users[user_id] = old
+                continue
+
+            # Flush sırasında gelen yeni kayıt isim ve son aktiflikte önceliklidir
+            entry["count"] += old["count"]
+            entry["last_active"] = max(entry["last_active"], old["last_active"])
+            entry["can_insert"] = entry["can_insert"] or old["can_insert"]
+
+
 async def clean_inactive_users(group_id: int) -> int:
     """
-    İnaktif kullanıcıları temizle
+    İnaktif kullanıcıları temizle (artımlı)
+
+    Sadece indeksteki süresi dolmuş kullanıcılar alınır ve tek sorguda silinir;
+    süresi dolan kimse yoksa veritabanına gidilmez.
 
     Returns:
         int: Silinen kullanıcı sayısı
     """
     try:
-        async with db.pool.acquire() as conn:
-            session = await conn.fetchrow("""
-                SELECT id, active_duration FROM roll_sessions WHERE group_id = $1
-            """, group_id)
+        state = await _get_cached_state(group_id)
+        index = _eviction_index.get(group_id)
 
-            if not session:
-                return 0
+        if not index:
+            return 0
 
-            timeout_minutes = session['active_duration']
-            cutoff_time = datetime.utcnow() - timedelta(minutes=timeout_minutes)
+        cutoff_time = datetime.utcnow() - timedelta(minutes=state['active_duration'])
 
-            # İnaktif kullanıcıları sil
-            result = await conn.execute("""
-                DELETE FROM roll_step_users
-                WHERE step_id IN (
-                    SELECT id FROM roll_steps WHERE session_id = $1
-                )
-                AND last_active < $2
-            """, session['id'], cutoff_time)
+        heap = index['heap']
+        last_active = index['last_active']
+        candidates = {}
 
-            # Boş adımları sil (aktif olmayanlar)
-            await conn.execute("""
-                DELETE FROM roll_steps
-                WHERE session_id = $1
-                AND is_active = FALSE
-                AND NOT EXISTS (
-                    SELECT 1 FROM roll_step_users WHERE step_id = roll_steps.id
-                )
-            """, session['id'])
+        while heap and heap[0][0] < cutoff_time:
+            ts, step_id, user_id = heapq.heappop(heap)
+            # Güncelliğini yitirmiş heap kaydı
+            if last_active.get((step_id, user_id)) == ts:
+                candidates[(step_id, user_id)] = ts
+
+        if not candidates:
+            return 0
+
+        # Yazılmamış mesajı olan kullanıcı yanlışlıkla silinmesin
+        await flush_roll_activity()
 
-            deleted = int(result.split()[-1]) if result else 0
-            return deleted
+        step_ids = [key[0] for key in candidates]
+        user_ids = [key[1] for key in candidates]
+
+        async with db.pool.acquire() as conn:
+            async with conn.transaction():
+                deleted = await conn.fetch("""
+                    DELETE FROM roll_step_users u
+                    USING unnest($1::int[], $2::bigint[]) AS t(step_id, user_id)
+                    WHERE u.step_id = t.step_id
+                    AND u.telegram_user_id = t.user_id
+                    AND u.last_active < $3
+                    RETURNING u.step_id, u.telegram_user_id
+                """, step_ids, user_ids, cutoff_time)
+
+                # Boş adımları sil (aktif olmayanlar) - sadece etkilenen adımlar
+                await conn.execute("""
+                    DELETE FROM roll_steps
+                    WHERE id = ANY($1::int[])
+                    AND is_active = FALSE
+                    AND NOT EXISTS (
+                        SELECT 1 FROM roll_step_users WHERE step_id = roll_steps.id
+                    )
+                """, list(set(step_ids)))
+
+            # Bekleme sırasında yeniden aktif olanların indeks kaydına dokunulmaz
+            for row in deleted:
+                key = (row['step_id'], row['telegram_user_id'])
+                if last_active.get(key) == candidates.pop(key, None):
+                    last_active.pop(key, None)
+
+            # Silinmeyenlerin gerçek zamanını veritabanından al, kaydı olmayanları indeksten çıkar
+            if candidates:
+                rows = await conn.fetch("""
+                    SELECT u.step_id, u.telegram_user_id, u.last_active
+                    FROM roll_step_users u
+                    JOIN unnest($1::int[], $2::bigint[]) AS t(step_id, user_id)
+                        ON u.step_id = t.step_id AND u.telegram_user_id = t.user_id
+                """, [key[0] for key in candidates], [key[1] for key in candidates])
+
+                for row in rows:
+                    key = (row['step_id'], row['telegram_user_id'])
+                    if last_active.get(key) == candidates.pop(key, None):
+                        last_active[key] = row['last_active']
+                        heapq.heappush(index['heap'], (row['last_active'], key[0], key[1]))
+
+                for key, ts in candidates.items():
+                    if last_active.get(key) == ts:
+                        last_active.pop(key, None)
+
+        return len(deleted)
 
     except Exception as e:
         print(f"❌ İnaktif temizleme hatası: {e}")
+        # İndeks tutarsız kalmasın - bir sonraki erişimde yeniden yüklenir
+        _roll_cache.pop(group_id, None)
+        _eviction_index.pop(group_id, None)
         return 0
 
 
+async def evict_inactive_users() -> int:
+    """
+    Aktif roll'lardaki süresi dolmuş kullanıcıları temizle (zamanlayıcı için)
+
+    Returns:
+        int: Toplam silinen kullanıcı sayısı
+    """
+    total = 0
+
+    for group_id in list(_eviction_index):
+        state = _roll_cache.get(group_id)
+        if not state or state['status'] not in TRACKED_STATUSES:
+            continue
+
+        total += await clean_inactive_users(group_id)
+
+    return total
+
+
 async def get_status_list(group_id: int, return_raw: bool = False) -> Tuple[str, List[Dict], Dict]:
     """
     Roll durumu ve kullanıcı listesini getir
@@ -545,6 +854,9 @@ async def get_status_list(group_id: int, return_raw: bool = False) -> Tuple[str,
         tuple: (Durum metni, Adımlar listesi, Session bilgisi)
     """
     try:
+        # Listeler kesin olsun diye bekleyen aktiviteyi önce yaz
+        await flush_roll_activity()
+
         async with db.pool.acquire() as conn:
             session = await conn.fetchrow("""
                 SELECT id, status, active_duration, current_step, created_at
@@ -555,32 +867,38 @@ async def get_status_list(group_id: int, return_raw: bool = False) -> Tuple[str,
                 return "stopped", [], {}
 
             # Aktif durumlarda temizlik yap
-            if session['status'] in [STATUS_ACTIVE, STATUS_LOCKED, STATUS_LOCKED_BREAK]:
+            if session['status'] in TRACKED_STATUSES:
                 await clean_inactive_users(group_id)
 
-            # Adımları getir
-            steps = await conn.fetch("""
-                SELECT id, step_number, is_active, created_at
-                FROM roll_steps
-                WHERE session_id = $1
-                ORDER BY step_number ASC
+            # Adımlar ve kullanıcılar tek sorguda - sıralama veritabanında
+            rows = await conn.fetch("""
+                SELECT st.id AS step_id, st.step_number, st.is_active, st.created_at,
+                       u.telegram_user_id, u.name, u.message_count
+                FROM roll_steps st
+                LEFT JOIN roll_step_users u ON u.step_id = st.id
+                WHERE st.session_id = $1
+                ORDER BY st.step_number ASC, u.message_count DESC, u.telegram_user_id ASC
             """, session['id'])
 
             result_steps = []
-            for step in steps:
-                users = await conn.fetch("""
-                    SELECT telegram_user_id, name, message_count
-                    FROM roll_step_users
-                    WHERE step_id = $1
-                    ORDER BY message_count DESC
-                """, step['id'])
-
-                result_steps.append({
-                    'step_number': step['step_number'],
-                    'is_active': step['is_active'],
-                    'created_at': step['created_at'],
-                    'users': [dict(u) for u in users]
-                })
+            current_step_id = None
+            for row in rows:
+                if row['step_id'] != current_step_id:
+                    current_step_id = row['step_id']
+                    result_steps.append({
+                        'step_number': row['step_number'],
+                        'is_active': row['is_active'],
+                        'created_at': row['created_at'],
+                        'users': []
+                    })
+
+                # LEFT JOIN - kullanıcısı olmayan adımda satır NULL gelir
+                if row['telegram_user_id'] is not None:
+                    result_steps[-1]['users'].append({
+                        'telegram_user_id': row['telegram_user_id'],
+                        'name': row['name'],
+                        'message_count': row['message_count']
+                    })
 
             # Session bilgisini döndür
             session_info = {
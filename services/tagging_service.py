@@ -1,21 +1,43 @@
 """
 🏷️ Etiketleme Servisi
 Kullanıcıları mention ile etiketler
-- /etiket: 5'erli grup halinde etiketleme
+- /etiket: Mesaj başına entity/uzunluk sınırının izin verdiği kadar mention
 - /naber: Tek tek rastgele cümlelerle etiketleme
+- Gönderim aralığı flood cevaplarına göre uyarlanır, mesajlar düşürülmez
+- İşler tagging_jobs tablosunda tutulur; yeniden başlatmada kaldığı yerden devam eder
 """
 
 import asyncio
+import html
 import random
-from typing import List, Dict, Any, Optional
+import time
+from typing import Dict, Any, Optional, AsyncIterable, AsyncIterator, Tuple
 from database import db
-from telegram.error import RetryAfter, TelegramError
-
-
-# Aktif etiketleme işlemleri (grup bazlı)
-# {group_id: {"type": "etiket"|"naber", "active": True, "task": asyncio.Task}}
+from telegram.error import RetryAfter, TelegramError, NetworkError, Forbidden, BadRequest, ChatMigrated
+from utils.rate_limiter import PRIORITY_BULK
+from config import (
+    TAGGING_MIN_INTERVAL, TAGGING_MAX_INTERVAL, TAGGING_INTERVAL_STEP,
+    TAGGING_PROGRESS_INTERVAL, TAGGING_MAX_SEND_ATTEMPTS,
+    TAGGING_PAGE_SIZE, TAGGING_JOB_STALE_AFTER,
+    ETIKET_MAX_MENTIONS, TELEGRAM_MAX_MESSAGE_LENGTH
+)
+
+
+# Bu süreçte çalışan etiketleme işleri (grup bazlı, kalıcı kayıt: tagging_jobs)
+# {group_id: {"job_id": int, "type": "etiket"|"naber", "active": True, "task": asyncio.Task}}
 active_tagging_sessions: Dict[int, Dict[str, Any]] = {}
 
+# Sohbetin tamamını ilgilendiren BadRequest metinleri (iş 'failed' olarak biter)
+_CHAT_LEVEL_ERRORS = (
+    "chat not found",
+    "not enough rights",
+    "have no rights",
+    "chat_write_forbidden",
+    "chat_restricted",
+    "topic_closed",
+    "need administrator rights",
+)
+
 
 # /naber için rastgele cümleler - Premium emojilerle
 NABER_MESSAGES = [
@@ -42,29 +64,82 @@ NABER_MESSAGES = [
 ]
 
 
-async def get_group_users(group_id: int) -> List[Dict[str, Any]]:
+async def count_group_users(group_id: int) -> int:
     """
-    Gruptaki kayıtlı kullanıcıları getir
+    Gruptaki kayıtlı kullanıcı sayısını getir (ilerleme için)
 
     Args:
         group_id: Telegram grup ID
 
     Returns:
-        List[Dict]: Kullanıcı listesi
+        int: Kullanıcı sayısı
     """
     try:
         async with db.pool.acquire() as conn:
-            users = await conn.fetch("""
-                SELECT telegram_id, username, first_name, last_name
-                FROM telegram_users
-                WHERE group_id = $1
-                ORDER BY message_count DESC
-            """, group_id)
-
-            return [dict(u) for u in users]
+            return await conn.fetchval(
+                "SELECT COUNT(*) FROM telegram_users WHERE group_id = $1",
+                group_id
+            )
     except Exception as e:
-        print(f"❌ Kullanıcı listesi getirme hatası: {e}")
-        return []
+        print(f"❌ Kullanıcı sayısı getirme hatası: {e}")
+        return 0
+
+
+async def iter_group_users(
+    group_id: int,
+    cursor: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Gruptaki kayıtlı kullanıcıları sayfa sayfa getir (keyset sayfalama)
+
+    Sıralama: telegram_id. Değişmeyen anahtar kullanılır; etiketleme sürerken
+    mesaj sayısı artan kullanıcı atlanmaz ya da iki kez etiketlenmez. Bellekte
+    aynı anda sadece bir sayfa tutulur; bağlantı sayfalar arasında havuza geri verilir.
+
+    Args:
+        group_id: Telegram grup ID
+        cursor: telegram_id - bu kullanıcıdan sonrasını getir
+
+    Yields:
+        Dict: Kullanıcı (telegram_id, username, first_name, last_name)
+    """
+    while True:
+        async with db.pool.acquire() as conn:
+            if cursor is None:
+                rows = await conn.fetch("""
+                    SELECT telegram_id, username, first_name, last_name
+                    FROM telegram_users
+                    WHERE group_id = $1
+                    ORDER BY telegram_id
+                    LIMIT $2
+                """, group_id, TAGGING_PAGE_SIZE)
+            else:
+                rows = await conn.fetch("""
+                    SELECT telegram_id, username, first_name, last_name
+                    FROM telegram_users
+                    WHERE group_id = $1 AND telegram_id > $2
+                    ORDER BY telegram_id
+                    LIMIT $3
+                """, group_id, cursor, TAGGING_PAGE_SIZE)
+
+        for row in rows:
+            yield dict(row)
+
+        if len(rows) < TAGGING_PAGE_SIZE:
+            return
+
+        cursor = rows[-1]['telegram_id']
+
+
+def _mention_label(user: Dict[str, Any]) -> str:
+    """Mention'ın mesajda görünen metni (@username veya isim)"""
+    telegram_id = user['telegram_id']
+    username = user.get('username')
+
+    if username:
+        return f'@{username}'
+
+    return user.get('first_name') or f"User{str(telegram_id)[-4:]}"
 
 
 def format_user_mention(user: Dict[str, Any]) -> str:
@@ -78,49 +153,463 @@ def format_user_mention(user: Dict[str, Any]) -> str:
     Returns:
         str: Mention formatı
     """
-    telegram_id = user['telegram_id']
-    username = user.get('username')
-    first_name = user.get('first_name') or f"User{str(telegram_id)[-4:]}"
-
     # Username varsa @username kullan (daha güvenilir, her zaman çalışır)
-    if username:
-        return f'@{username}'
+    if user.get('username'):
+        return _mention_label(user)
 
     # Username yoksa tg://user formatı kullan
-    return f'<a href="tg://user?id={telegram_id}">{first_name}</a>'
+    return f'<a href="tg://user?id={user["telegram_id"]}">{html.escape(_mention_label(user))}</a>'
 
 
-def is_tagging_active(group_id: int) -> bool:
+def _utf16_len(text: str) -> int:
+    """Telegram uzunluk sınırı UTF-16 birimiyle ölçülür"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _user_cursor(user: Dict[str, Any]) -> int:
+    """Kullanıcının sayfalama imleci (telegram_id)"""
+    return user['telegram_id']
+
+
+def _etiket_header(message: str) -> Tuple[str, int]:
+    """/etiket başlığı (HTML kaçışlı) ve görünen uzunluğu (UTF-16)"""
+    visible = f"💎 {message}\n\n"
+    return html.escape(visible, quote=False), _utf16_len(visible)
+
+
+async def _build_etiket_batches(
+    users: AsyncIterable[Dict[str, Any]],
+    message: str
+) -> AsyncIterator[Tuple[str, int, int]]:
     """
-    Grupta aktif etiketleme var mı kontrol et
+    /etiket mesajlarını oluştur - her mesaja entity ve uzunluk sınırına
+    sığan kadar mention koyar
+
+    Yields:
+        (mesaj metni, mesajdaki kullanıcı sayısı, son kullanıcının imleci)
     """
-    session = active_tagging_sessions.get(group_id)
-    return session is not None and session.get('active', False)
+    header, header_len = _etiket_header(message)
+
+    mentions = []
+    length = header_len
+    cursor = None
+
+    async for user in users:
+        visible = _utf16_len(_mention_label(user)) + 1
+
+        if mentions and (
+            len(mentions) >= ETIKET_MAX_MENTIONS
+            or length + visible > TELEGRAM_MAX_MESSAGE_LENGTH
+        ):
+            yield header + " ".join(mentions), len(mentions), cursor
+            mentions = []
+            length = header_len
+
+        mentions.append(format_user_mention(user))
+        length += visible
+        cursor = _user_cursor(user)
 
+    if mentions:
+        yield header + " ".join(mentions), len(mentions), cursor
 
-def stop_tagging(group_id: int) -> bool:
+
+async def _build_naber_batches(
+    users: AsyncIterable[Dict[str, Any]]
+) -> AsyncIterator[Tuple[str, int, int]]:
+    """/naber mesajlarını oluştur - kullanıcı başına bir mesaj"""
+    async for user in users:
+        yield f"{format_user_mention(user)} {random.choice(NABER_MESSAGES)}", 1, _user_cursor(user)
+
+
+class _AdaptivePacer:
     """
-    Gruptaki aktif etiketleme işlemini durdur
+    Gönderim aralığını flood cevaplarına göre ayarlar
+    - RetryAfter: aralık ikiye katlanır (en az retry_after kadar)
+    - Başarılı gönderim: aralık adım adım en kısa değere iner
+    """
+
+    def __init__(self):
+        self.interval = TAGGING_MIN_INTERVAL
+        self._last_sent = 0.0
+
+    async def wait(self):
+        """Son gönderimden bu yana aralık dolana kadar bekle"""
+        remaining = self._last_sent + self.interval - time.monotonic()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    def on_success(self):
+        self._last_sent = time.monotonic()
+        self.interval = max(TAGGING_MIN_INTERVAL, self.interval - TAGGING_INTERVAL_STEP)
+
+    def on_flood(self, retry_after: float):
+        self.interval = min(TAGGING_MAX_INTERVAL, max(self.interval * 2, retry_after))
+
+
+def _is_chat_level_error(error: BadRequest) -> bool:
+    """Hata tüm sohbeti mi ilgilendiriyor (sonraki mesajlar da gönderilemez)"""
+    text = error.message.lower()
+    return any(part in text for part in _CHAT_LEVEL_ERRORS)
+
+
+async def _send_batch(bot, group_id: int, text: str, pacer: _AdaptivePacer, session: Dict[str, Any]) -> bool:
+    """
+    Bir etiketleme mesajını gönderilene kadar dene
+
+    Flood cevaplarında mesaj düşürülmez; beklenip aynı mesaj tekrar gönderilir.
+    Bot gruptan atıldıysa veya gruba yazamıyorsa (Forbidden, sohbet düzeyi
+    BadRequest) hata yukarı iletilir; mesaja özgü BadRequest'te mesaj atlanır.
 
     Returns:
-        bool: Durduruldu mu
+        bool: Gönderildi mi (False: kalıcı hata, mesaj atlandı)
     """
-    session = active_tagging_sessions.get(group_id)
+    attempts = 0
 
-    if not session:
-        return False
+    while session.get('active'):
+        await pacer.wait()
+
+        try:
+            await bot.send_message(
+                group_id,
+                text,
+                parse_mode="HTML",
+                rate_limit_args=PRIORITY_BULK
+            )
+            pacer.on_success()
+            return True
+
+        except RetryAfter as e:
+            retry_after = float(e.retry_after)
+            pacer.on_flood(retry_after)
+            print(f"⏳ Etiketleme flood control: Grup={group_id}, {retry_after} saniye bekleniyor "
+                  f"(yeni aralık: {pacer.interval:.1f} sn)")
+            await asyncio.sleep(retry_after)
+
+        except (Forbidden, ChatMigrated):
+            raise
+
+        except BadRequest as e:
+            # BadRequest, NetworkError alt sınıfı - tekrar denemek sonucu değiştirmez
+            if _is_chat_level_error(e):
+                raise
+            print(f"❌ Etiket mesaj gönderme hatası: {e}")
+            return False
+
+        except NetworkError as e:
+            attempts += 1
+            if attempts >= TAGGING_MAX_SEND_ATTEMPTS:
+                print(f"❌ Etiket mesaj gönderme hatası (ağ): {e}")
+                return False
+            await asyncio.sleep(pacer.interval)
+
+        except TelegramError as e:
+            print(f"❌ Etiket mesaj gönderme hatası: {e}")
+            return False
+
+    return False
+
+
+def _progress_text(label: str, state: str, done: int, total: int, skipped: int) -> str:
+    """İlerleme mesajı metni"""
+    icons = {"running": "⏳", "done": "✅", "stopped": "🛑"}
+    states = {"running": "sürüyor", "done": "tamamlandı", "stopped": "durduruldu"}
+
+    text = f"{icons[state]} <b>{label} {states[state]}</b>\n\n👥 {done}/{total} kullanıcı etiketlendi"
+    if skipped:
+        text += f"\n⚠️ {skipped} kullanıcı atlandı"
+    return text
+
+
+async def _update_progress(bot, group_id: int, message_id: Optional[int], text: str):
+    """İlerleme mesajını düzenle (hata olursa sessizce geç)"""
+    if message_id is None:
+        return
+    try:
+        await bot.edit_message_text(
+            text,
+            chat_id=group_id,
+            message_id=message_id,
+            parse_mode="HTML",
+            rate_limit_args=PRIORITY_BULK
+        )
+    except TelegramError:
+        pass
+
+
+# ============================================
+# Kalıcı Etiketleme İşleri (tagging_jobs)
+# ============================================
+
+async def _create_job(group_id: int, job_type: str, message: Optional[str], total: int) -> Optional[Dict[str, Any]]:
+    """
+    Yeni etiketleme işi oluştur
 
+    Grupta zaten çalışan bir iş varsa (başka bir süreçte bile) oluşturmaz.
+
+    Returns:
+        Dict|None: İş kaydı
+    """
+    try:
+        async with db.pool.acquire() as conn:
+            job = await conn.fetchrow("""
+                INSERT INTO tagging_jobs (group_id, job_type, message, total_count, heartbeat_at)
+                VALUES ($1, $2, $3, $4, NOW())
+                ON CONFLICT (group_id) WHERE status = 'running' DO NOTHING
+                RETURNING *
+            """, group_id, job_type, message, total)
+
+            return dict(job) if job else None
+    except Exception as e:
+        print(f"❌ Etiketleme işi oluşturma hatası: {e}")
+        return None
+
+
+async def _save_job_progress(job_id: int, cursor: int, done: int, skipped: int) -> bool:
+    """
+    İşin kaldığı yeri kaydet
+
+    Returns:
+        bool: İş hâlâ çalışıyor mu (False: /dur ile durduruldu)
+    """
+    try:
+        async with db.pool.acquire() as conn:
+            status = await conn.fetchval("""
+                UPDATE tagging_jobs
+                SET cursor_telegram_id = $2,
+                    done_count = $3, skipped_count = $4,
+                    heartbeat_at = NOW(), updated_at = NOW()
+                WHERE id = $1
+                RETURNING status
+            """, job_id, cursor, done, skipped)
+
+            return status == 'running'
+    except Exception as e:
+        # Kayıt bir sonraki mesajda tekrar denenir
+        print(f"❌ Etiketleme ilerleme kaydetme hatası: {e}")
+        return True
+
+
+async def _set_job_progress_message(job_id: int, message_id: int):
+    """İlerleme mesajının ID'sini kaydet (devam ettirilen iş aynı mesajı düzenler)"""
+    try:
+        async with db.pool.acquire() as conn:
+            await conn.execute(
+                "UPDATE tagging_jobs SET progress_message_id = $2 WHERE id = $1",
+                job_id, message_id
+            )
+    except Exception as e:
+        print(f"❌ Etiketleme ilerleme mesajı kaydetme hatası: {e}")
+
+
+async def _finish_job(job_id: int, status: str):
+    """İşi bitir ('done' veya 'failed')"""
+    try:
+        async with db.pool.acquire() as conn:
+            await conn.execute("""
+                UPDATE tagging_jobs
+                SET status = $2, heartbeat_at = NULL, updated_at = NOW()
+                WHERE id = $1 AND status = 'running'
+            """, job_id, status)
+    except Exception as e:
+        print(f"❌ Etiketleme işi bitirme hatası: {e}")
+
+
+async def _run_tagging(
+    bot,
+    job: Dict[str, Any],
+    session: Dict[str, Any],
+    batches: AsyncIterable[Tuple[str, int, int]],
+    label: str,
+    initial_message
+):
+    """
+    Ortak etiketleme döngüsü (/etiket ve /naber)
+
+    Her mesajdan sonra kalınan yer tagging_jobs'a yazılır; süreç kapanırsa iş
+    'running' kalır ve sonraki süreç buradan devam eder.
+
+    Args:
+        bot: Telegram bot instance
+        job: tagging_jobs kaydı
+        session: active_tagging_sessions kaydı
+        batches: (mesaj metni, kullanıcı sayısı, imleç) üreteci
+        label: İlerleme mesajında görünecek ad
+        initial_message: İlk mesaj objesi (silmek için, yoksa None)
+    """
+    group_id = job['group_id']
+    job_id = job['id']
+    total = job['total_count']
+    done = job['done_count']
+    skipped = job['skipped_count']
+    progress_id = job['progress_message_id']
+    pacer = _AdaptivePacer()
+
+    try:
+        # İlk komutu sil
+        if initial_message is not None:
+            try:
+                await initial_message.delete()
+            except TelegramError:
+                pass
+
+        if progress_id is None:
+            try:
+                progress_msg = await bot.send_message(
+                    group_id,
+                    _progress_text(label, "running", done, total, skipped),
+                    parse_mode="HTML"
+                )
+                progress_id = progress_msg.message_id
+                await _set_job_progress_message(job_id, progress_id)
+            except TelegramError:
+                pass
+        else:
+            # Yeniden başlatma sonrası devam
+            await _update_progress(bot, group_id, progress_id, _progress_text(label, "running", done, total, skipped))
+
+        last_progress = time.monotonic()
+
+        async for text, count, cursor in batches:
+            # Durduruldu mu kontrol et
+            if not session.get('active'):
+                break
+
+            if await _send_batch(bot, group_id, text, pacer, session):
+                done += count
+            elif session.get('active'):
+                skipped += count
+            else:
+                break
+
+            # Kalınan yeri kaydet; /dur başka bir süreçten verildiyse dur
+            if not await _save_job_progress(job_id, cursor, done, skipped):
+                session['active'] = False
+                break
+
+            if time.monotonic() - last_progress >= TAGGING_PROGRESS_INTERVAL:
+                await _update_progress(bot, group_id, progress_id, _progress_text(label, "running", done, total, skipped))
+                last_progress = time.monotonic()
+
+        if session.get('active'):
+            await _finish_job(job_id, 'done')
+            state = "done"
+        else:
+            state = "stopped"
+        await _update_progress(bot, group_id, progress_id, _progress_text(label, state, done, total, skipped))
+
+    except asyncio.CancelledError:
+        # /dur ile iptal edildiyse mesajı güncelle; bot kapanıyorsa iş 'running' kalır
+        if not session.get('active'):
+            await _update_progress(bot, group_id, progress_id, _progress_text(label, "stopped", done, total, skipped))
+    except (Forbidden, BadRequest, ChatMigrated) as e:
+        # Bot gruptan atıldı / yazma yetkisi yok / sohbet yok - devam ettirilemez
+        # (_send_batch sadece sohbet düzeyi BadRequest'leri iletir)
+        print(f"❌ {label} hatası: Grup={group_id}, {e}")
+        await _finish_job(job_id, 'failed')
+    except Exception as e:
+        # Beklenmeyen hata: iş 'running' kalır, heartbeat eskiyince yeniden devralınır
+        print(f"❌ {label} hatası: {e}")
+    finally:
+        # Bittiğinde session'ı temizle (yerine yeni başlatılan oturuma dokunma)
+        if active_tagging_sessions.get(group_id) is session:
+            active_tagging_sessions.pop(group_id, None)
+
+
+def _launch_job(bot, job: Dict[str, Any], initial_message=None):
+    """Etiketleme işini bu süreçte başlat (yeni veya devam ettirilen)"""
+    group_id = job['group_id']
+
+    users = iter_group_users(group_id, job['cursor_telegram_id'])
+
+    if job['job_type'] == 'etiket':
+        batches = _build_etiket_batches(users, job['message'])
+        label = "Etiketleme"
+    else:
+        batches = _build_naber_batches(users)
+        label = "Naber"
+
+    # Session başlat
+    session = {
+        'job_id': job['id'],
+        'type': job['job_type'],
+        'active': True,
+        'task': None
+    }
+    active_tagging_sessions[group_id] = session
+
+    # Task'ı başlat
+    session['task'] = asyncio.create_task(_run_tagging(
+        bot, job, session, batches, label, initial_message
+    ))
+
+
+def _cancel_session(session: Dict[str, Any]):
+    """Yerel etiketleme task'ını durdur"""
     session['active'] = False
 
-    # Task'ı iptal et
     task = session.get('task')
     if task and not task.done():
         task.cancel()
 
-    # Session'ı temizle
-    active_tagging_sessions.pop(group_id, None)
 
-    return True
+async def get_tagging_type(group_id: int) -> Optional[str]:
+    """
+    Aktif etiketleme tipini döndür (tüm süreçler için veritabanından)
+
+    Returns:
+        str|None: "etiket" veya "naber" veya None
+    """
+    try:
+        async with db.pool.acquire() as conn:
+            return await conn.fetchval("""
+                SELECT job_type FROM tagging_jobs
+                WHERE group_id = $1 AND status = 'running'
+            """, group_id)
+    except Exception as e:
+        print(f"❌ Etiketleme durumu getirme hatası: {e}")
+        session = active_tagging_sessions.get(group_id)
+        if session and session.get('active'):
+            return session.get('type')
+        return None
+
+
+async def is_tagging_active(group_id: int) -> bool:
+    """
+    Grupta aktif etiketleme var mı kontrol et
+    """
+    return await get_tagging_type(group_id) is not None
+
+
+async def stop_tagging(group_id: int) -> bool:
+    """
+    Gruptaki aktif etiketleme işlemini durdur
+
+    İş veritabanında durdurulur; başka bir süreçte çalışıyorsa o süreç bir
+    sonraki mesajda veya heartbeat'te durur.
+
+    Returns:
+        bool: Durduruldu mu
+    """
+    stopped = False
+
+    try:
+        async with db.pool.acquire() as conn:
+            result = await conn.execute("""
+                UPDATE tagging_jobs
+                SET status = 'stopped', heartbeat_at = NULL, updated_at = NOW()
+                WHERE group_id = $1 AND status = 'running'
+            """, group_id)
+            stopped = result != "UPDATE 0"
+    except Exception as e:
+        print(f"❌ Etiketleme durdurma hatası: {e}")
+
+    # Bu süreçte çalışıyorsa task'ı hemen iptal et
+    session = active_tagging_sessions.get(group_id)
+    if session:
+        _cancel_session(session)
+        stopped = True
+
+    return stopped
 
 
 async def start_etiket_tagging(
@@ -130,7 +619,7 @@ async def start_etiket_tagging(
     initial_message
 ) -> bool:
     """
-    /etiket komutu - 5'erli mention etiketleme başlat
+    /etiket komutu - toplu mention etiketleme başlat
 
     Args:
         group_id: Grup ID
@@ -141,86 +630,23 @@ async def start_etiket_tagging(
     Returns:
         bool: Başlatıldı mı
     """
-    # Zaten aktif mi?
-    if is_tagging_active(group_id):
+    # Başlık tek başına mesaj sınırını dolduruyorsa mention sığmaz
+    if _etiket_header(message)[1] >= TELEGRAM_MAX_MESSAGE_LENGTH:
         return False
 
-    # Kullanıcıları getir
-    users = await get_group_users(group_id)
+    # Kullanıcı sayısı (kullanıcılar etiketleme sırasında sayfa sayfa okunur)
+    total = await count_group_users(group_id)
 
-    if not users:
+    if not total:
         return False
 
-    # Session başlat
-    active_tagging_sessions[group_id] = {
-        'type': 'etiket',
-        'active': True,
-        'task': None
-    }
+    # İş kaydı (grupta çalışan iş varsa oluşturulmaz)
+    job = await _create_job(group_id, 'etiket', message, total)
 
-    async def tagging_task():
-        try:
-            # İlk komutu sil
-            try:
-                await initial_message.delete()
-            except:
-                pass
-
-            # 5'erli gruplar halinde etiketle
-            batch_size = 5
-
-            for i in range(0, len(users), batch_size):
-                # Durduruldu mu kontrol et
-                session = active_tagging_sessions.get(group_id)
-                if not session or not session.get('active'):
-                    break
-
-                batch = users[i:i + batch_size]
-                mentions = [format_user_mention(u) for u in batch]
-
-                # Premium emojilerle mesaj oluştur
-                text = f"💎 {message}\n\n" + " ".join(mentions)
-
-                try:
-                    await bot.send_message(
-                        group_id,
-                        text,
-                        parse_mode="HTML"
-                    )
-                except RetryAfter as e:
-                    # Flood control - bekle ve tekrar dene
-                    wait_time = e.retry_after + 2
-                    print(f"⏳ Flood control, {wait_time} saniye bekleniyor...")
-                    await asyncio.sleep(wait_time)
-                    # Tekrar dene
-                    try:
-                        await bot.send_message(
-                            group_id,
-                            text,
-                            parse_mode="HTML"
-                        )
-                    except Exception:
-                        pass
-                except TelegramError as e:
-                    print(f"❌ Etiket mesaj gönderme hatası: {e}")
-
-                # Flood önleme - mesajlar arası bekleme (artırıldı)
-                await asyncio.sleep(4)
-
-            # Bittiğinde session'ı temizle
-            active_tagging_sessions.pop(group_id, None)
-
-        except asyncio.CancelledError:
-            # İptal edildi
-            pass
-        except Exception as e:
-            print(f"❌ Etiketleme hatası: {e}")
-            active_tagging_sessions.pop(group_id, None)
-
-    # Task'ı başlat
-    task = asyncio.create_task(tagging_task())
-    active_tagging_sessions[group_id]['task'] = task
+    if not job:
+        return False
 
+    _launch_job(bot, job, initial_message)
     return True
 
 
@@ -240,94 +666,117 @@ async def start_naber_tagging(
     Returns:
         bool: Başlatıldı mı
     """
-    # Zaten aktif mi?
-    if is_tagging_active(group_id):
+    # Kullanıcı sayısı (kullanıcılar etiketleme sırasında sayfa sayfa okunur)
+    total = await count_group_users(group_id)
+
+    if not total:
         return False
 
-    # Kullanıcıları getir
-    users = await get_group_users(group_id)
+    # İş kaydı (grupta çalışan iş varsa oluşturulmaz)
+    job = await _create_job(group_id, 'naber', None, total)
 
-    if not users:
+    if not job:
         return False
 
-    # Session başlat
-    active_tagging_sessions[group_id] = {
-        'type': 'naber',
-        'active': True,
-        'task': None
-    }
+    _launch_job(bot, job, initial_message)
+    return True
 
-    async def naber_task():
-        try:
-            # İlk komutu sil
-            try:
-                await initial_message.delete()
-            except:
-                pass
 
-            # Her kullanıcıyı tek tek etiketle
-            for user in users:
-                # Durduruldu mu kontrol et
-                session = active_tagging_sessions.get(group_id)
-                if not session or not session.get('active'):
-                    break
-
-                mention = format_user_mention(user)
-                random_msg = random.choice(NABER_MESSAGES)
-
-                text = f"{mention} {random_msg}"
-
-                try:
-                    await bot.send_message(
-                        group_id,
-                        text,
-                        parse_mode="HTML"
-                    )
-                except RetryAfter as e:
-                    # Flood control - bekle ve tekrar dene
-                    wait_time = e.retry_after + 2
-                    print(f"⏳ Flood control, {wait_time} saniye bekleniyor...")
-                    await asyncio.sleep(wait_time)
-                    # Tekrar dene
-                    try:
-                        await bot.send_message(
-                            group_id,
-                            text,
-                            parse_mode="HTML"
-                        )
-                    except Exception:
-                        pass
-                except TelegramError as e:
-                    print(f"❌ Naber mesaj gönderme hatası: {e}")
-
-                # Flood önleme - mesajlar arası bekleme (artırıldı)
-                await asyncio.sleep(4)
-
-            # Bittiğinde session'ı temizle
-            active_tagging_sessions.pop(group_id, None)
+async def heartbeat_tagging_jobs():
+    """
+    Bu süreçteki işlerin heartbeat'ini yenile
 
-        except asyncio.CancelledError:
-            # İptal edildi
-            pass
-        except Exception as e:
-            print(f"❌ Naber hatası: {e}")
-            active_tagging_sessions.pop(group_id, None)
+    Başka bir süreçten /dur ile durdurulan işler (uzun flood beklemesinde
+    olsalar bile) burada iptal edilir.
+    """
+    sessions = {
+        s['job_id']: s for s in list(active_tagging_sessions.values())
+        if s.get('active')
+    }
 
-    # Task'ı başlat
-    task = asyncio.create_task(naber_task())
-    active_tagging_sessions[group_id]['task'] = task
+    if not sessions:
+        return
 
-    return True
+    try:
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                UPDATE tagging_jobs SET heartbeat_at = NOW()
+                WHERE id = ANY($1::int[]) AND status = 'running'
+                RETURNING id
+            """, list(sessions.keys()))
+    except Exception as e:
+        print(f"❌ Etiketleme heartbeat hatası: {e}")
+        return
 
+    running = {r['id'] for r in rows}
+    for job_id, session in sessions.items():
+        if job_id not in running:
+            _cancel_session(session)
 
-def get_tagging_type(group_id: int) -> Optional[str]:
+
+async def resume_tagging_jobs(bot) -> int:
     """
-    Aktif etiketleme tipini döndür
+    Yarım kalmış etiketleme işlerini devral ve kaldığı yerden devam ettir
+
+    Heartbeat'i TAGGING_JOB_STALE_AFTER saniyedir yenilenmeyen (veya kapanışta
+    bırakılan) işler alınır; böylece başka bir süreçte çalışan iş devralınmaz.
 
     Returns:
-        str|None: "etiket" veya "naber" veya None
+        int: Devam ettirilen iş sayısı
     """
-    session = active_tagging_sessions.get(group_id)
-    if session and session.get('active'):
-        return session.get('type')
-    return None
+    local_job_ids = [s['job_id'] for s in list(active_tagging_sessions.values())]
+
+    try:
+        async with db.pool.acquire() as conn:
+            jobs = await conn.fetch("""
+                UPDATE tagging_jobs SET heartbeat_at = NOW()
+                WHERE id IN (
+                    SELECT id FROM tagging_jobs
+                    WHERE status = 'running'
+                      AND (heartbeat_at IS NULL OR heartbeat_at < NOW() - make_interval(secs => $1))
+                      AND NOT (id = ANY($2::int[]))
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING *
+            """, float(TAGGING_JOB_STALE_AFTER), local_job_ids)
+    except Exception as e:
+        print(f"❌ Etiketleme işlerini devralma hatası: {e}")
+        return 0
+
+    for job in jobs:
+        _launch_job(bot, dict(job))
+
+    if jobs:
+        print(f"🏷️ {len(jobs)} etiketleme işi kaldığı yerden devam ediyor")
+
+    return len(jobs)
+
+
+async def shutdown_tagging():
+    """
+    Bot kapanırken bu süreçteki etiketleme task'larını durdur
+
+    post_stop'ta (bot HTTP istemcisi kapanmadan önce) çağrılır. İşler 'running'
+    kalır ve heartbeat bırakılır; sonraki süreç beklemeden devralır.
+    """
+    sessions = list(active_tagging_sessions.values())
+    tasks = [s['task'] for s in sessions if s.get('task') and not s['task'].done()]
+
+    for task in tasks:
+        task.cancel()
+
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    job_ids = [s['job_id'] for s in sessions if s.get('active')]
+    if not job_ids:
+        return
+
+    try:
+        async with db.pool.acquire() as conn:
+            await conn.execute("""
+                UPDATE tagging_jobs SET heartbeat_at = NULL
+                WHERE id = ANY($1::int[]) AND status = 'running'
+            """, job_ids)
+    except Exception as e:
+        print(f"❌ Etiketleme kapanış hatası: {e}")
@@ -3,6 +3,8 @@
 Tüm bot mesajları burada merkezi olarak tutulur
 """
 
+from config import REQUIREMENT_RECENT_HOURS
+
 # ============================================
 # 🏠 ANA MENÜ
 # ============================================
@@ -156,6 +158,7 @@ BUTTONS = {
     "GUNLUK_MESAJ": "📅 Günlük Mesaj",
     "HAFTALIK_MESAJ": "📆 Haftalık Mesaj",
     "AYLIK_MESAJ": "🗓️ Aylık Mesaj",
+    "SON_SAATLER": f"⏱️ Son {REQUIREMENT_RECENT_HOURS} Saat Mesaj",
     "TOPLAM_MESAJ": "📈 Toplam Mesaj",
     "RANDY_SONRASI": "🎲 Randy Sonrası Mesaj",
 
@@ -256,6 +259,7 @@ def get_period_text(period: str) -> str:
         "daily": "Bugün",
         "weekly": "Bu hafta",
         "monthly": "Bu ay",
+        "recent": f"Son {REQUIREMENT_RECENT_HOURS} saat",
         "all_time": "Toplam",
         "post_randy": "Randy sonrası"
     }
@@ -3,39 +3,144 @@
 Telegram API ile admin kontrolü ve cache yönetimi
 """
 
+import asyncio
 import time
-from typing import Optional, Dict, Tuple
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple, Set, List
 from telegram import Bot, ChatMember
 from telegram.error import TelegramError
-from config import ADMIN_CACHE_TTL, IGNORED_USER_IDS, ACTIVITY_GROUP_ID
+from config import (
+    ADMIN_CACHE_TTL, ADMIN_CACHE_MAX_SIZE, ADMIN_ROSTER_TTL, ADMIN_ROSTER_FAILURE_TTL,
+    IGNORED_USER_IDS, ACTIVITY_GROUP_ID
+)
 
 
-# Admin cache: {(group_id, user_id): (is_admin, timestamp)}
-_admin_cache: Dict[Tuple[int, int], Tuple[bool, float]] = {}
+# Admin cache (LRU): {(group_id, user_id): (is_admin, timestamp)}
+_admin_cache: "OrderedDict[Tuple[int, int], Tuple[bool, float]]" = OrderedDict()
 
+# Grup indeksi (grup bazlı temizlik için): {group_id: {user_id}}
+_admin_cache_by_group: Dict[int, Set[int]] = {}
 
-async def is_group_admin(bot: Bot, group_id: int, user_id: int) -> bool:
+# Devam eden Telegram sorguları - aynı (grup, kullanıcı) için tek istek atılır
+_admin_inflight: Dict[Tuple[int, int], asyncio.Task] = {}
+
+# Grup admin listeleri (tek get_chat_administrators ile): {group_id: (admin_ids, timestamp)}
+# admin_ids None ise liste alınamadı; ADMIN_ROSTER_FAILURE_TTL boyunca tekrar denenmez
+_admin_rosters: Dict[int, Tuple[Optional[Set[int]], float]] = {}
+_roster_inflight: Dict[int, asyncio.Task] = {}
+
+
+async def _fetch_admin_roster(bot: Bot, group_id: int) -> Optional[Set[int]]:
+    """Grubun admin listesini Telegram API'den al ve cache'e yaz"""
+    try:
+        admins = await bot.get_chat_administrators(group_id)
+        admin_ids = {member.user.id for member in admins}
+
+        _admin_rosters[group_id] = (admin_ids, time.time())
+        return admin_ids
+
+    except TelegramError as e:
+        print(f"❌ Admin listesi hatası: Grup={group_id}, {e}")
+        # Hata kısa süre cache'lenir (her admin kontrolünde başarısız çağrı yapılmasın)
+        _admin_rosters[group_id] = (None, time.time())
+        return None
+
+
+async def get_group_admins(bot: Bot, group_id: int) -> Optional[Set[int]]:
     """
-    Kullanıcının grupta admin olup olmadığını kontrol et
+    Grubun admin ID'lerini getir (cache'den - süre dolduysa tek API çağrısıyla)
 
     Args:
         bot: Telegram Bot instance
         group_id: Grup ID
-        user_id: Kullanıcı ID
 
     Returns:
-        bool: Admin ise True
+        set: Admin kullanıcı ID'leri, alınamazsa None
+    """
+    cached = _admin_rosters.get(group_id)
+    if cached is not None:
+        admin_ids, cached_time = cached
+        ttl = ADMIN_ROSTER_TTL if admin_ids is not None else ADMIN_ROSTER_FAILURE_TTL
+        if time.time() - cached_time < ttl:
+            return admin_ids
+
+    # Aynı anda gelen istekler tek sorguyu bekler
+    task = _roster_inflight.get(group_id)
+
+    if task is None:
+        task = asyncio.ensure_future(_fetch_admin_roster(bot, group_id))
+        _roster_inflight[group_id] = task
+        task.add_done_callback(
+            lambda t: _roster_inflight.pop(group_id, None) if _roster_inflight.get(group_id) is t else None
+        )
+
+    return await asyncio.shield(task)
+
+
+async def refresh_admin_roster(bot: Bot, group_id: int) -> Optional[Set[int]]:
+    """Grubun admin listesini cache'e bakmadan yeniden al"""
+    return await _fetch_admin_roster(bot, group_id)
+
+
+async def prefetch_admin_rosters(bot: Bot, group_ids: List[int]):
+    """Birden fazla grubun admin listesini eşzamanlı önceden al"""
+    await asyncio.gather(*(get_group_admins(bot, group_id) for group_id in set(group_ids)))
+
+
+def update_admin_roster(group_id: int, user_id: int, is_admin: bool):
     """
+    chat_member güncellemesiyle admin listesini güncelle
+
+    Args:
+        group_id: Grup ID
+        user_id: Kullanıcı ID
+        is_admin: Yeni durumda admin ise True
+    """
+    cached = _admin_rosters.get(group_id)
+    if cached is not None and cached[0] is not None:
+        admin_ids, _ = cached
+        if is_admin:
+            admin_ids.add(user_id)
+        else:
+            admin_ids.discard(user_id)
+
+    # Kullanıcı bazlı cache de güncel kalsın
+    if (group_id, user_id) in _admin_cache:
+        _cache_admin(group_id, user_id, is_admin, time.time())
+
+
+def clear_admin_roster(group_id: int = None):
+    """Admin listesi cache'ini temizle (None ise hepsini)"""
+    if group_id is None:
+        _admin_rosters.clear()
+    else:
+        _admin_rosters.pop(group_id, None)
+
+
+def _cache_admin(group_id: int, user_id: int, is_admin: bool, now: float):
+    """Admin sonucunu cache'e yaz, boyut sınırını aşarsa en eskiyi at"""
     cache_key = (group_id, user_id)
-    now = time.time()
 
-    # Cache'de var mı kontrol et
-    if cache_key in _admin_cache:
-        is_admin, cached_time = _admin_cache[cache_key]
-        if now - cached_time < ADMIN_CACHE_TTL:
-            return is_admin
+    _admin_cache[cache_key] = (is_admin, now)
+    _admin_cache.move_to_end(cache_key)
+    _admin_cache_by_group.setdefault(group_id, set()).add(user_id)
+
+    while len(_admin_cache) > ADMIN_CACHE_MAX_SIZE:
+        (old_group, old_user), _ = _admin_cache.popitem(last=False)
+        _drop_from_group_index(old_group, old_user)
+
 
-    # Telegram API'den kontrol et
+def _drop_from_group_index(group_id: int, user_id: int):
+    """Grup indeksinden kullanıcıyı çıkar"""
+    users = _admin_cache_by_group.get(group_id)
+    if users is not None:
+        users.discard(user_id)
+        if not users:
+            del _admin_cache_by_group[group_id]
+
+
+async def _fetch_admin_status(bot: Bot, group_id: int, user_id: int) -> bool:
+    """Telegram API'den admin durumunu al ve cache'e yaz"""
     try:
         member = await bot.get_chat_member(group_id, user_id)
         is_admin = member.status in [
@@ -44,7 +149,7 @@ async def is_group_admin(bot: Bot, group_id: int, user_id: int) -> bool:
         ]
 
         # Cache'e kaydet
-        _admin_cache[cache_key] = (is_admin, now)
+        _cache_admin(group_id, user_id, is_admin, time.time())
 
         return is_admin
 
@@ -53,6 +158,49 @@ async def is_group_admin(bot: Bot, group_id: int, user_id: int) -> bool:
         return False
 
 
+async def is_group_admin(bot: Bot, group_id: int, user_id: int) -> bool:
+    """
+    Kullanıcının grupta admin olup olmadığını kontrol et
+
+    Args:
+        bot: Telegram Bot instance
+        group_id: Grup ID
+        user_id: Kullanıcı ID
+
+    Returns:
+        bool: Admin ise True
+    """
+    # Grubun admin listesi varsa bellekte kontrol edilir
+    admin_ids = await get_group_admins(bot, group_id)
+    if admin_ids is not None:
+        return user_id in admin_ids
+
+    # Admin listesi alınamadıysa kullanıcı bazlı kontrol
+    cache_key = (group_id, user_id)
+    now = time.time()
+
+    # Cache'de var mı kontrol et
+    cached = _admin_cache.get(cache_key)
+    if cached is not None:
+        is_admin, cached_time = cached
+        if now - cached_time < ADMIN_CACHE_TTL:
+            _admin_cache.move_to_end(cache_key)
+            return is_admin
+
+    # Telegram API'den kontrol et - aynı anda gelen istekler tek sorguyu bekler
+    task = _admin_inflight.get(cache_key)
+
+    if task is None:
+        task = asyncio.ensure_future(_fetch_admin_status(bot, group_id, user_id))
+        _admin_inflight[cache_key] = task
+        task.add_done_callback(
+            lambda t: _admin_inflight.pop(cache_key, None) if _admin_inflight.get(cache_key) is t else None
+        )
+
+    # Bekleyen iptal edilse bile ortak sorgu devam eder
+    return await asyncio.shield(task)
+
+
 async def is_activity_group_admin(bot: Bot, user_id: int) -> bool:
     """
     Kullanıcının ACTIVITY_GROUP_ID'de admin olup olmadığını kontrol et
@@ -85,6 +233,9 @@ async def get_user_admin_groups(bot: Bot, user_id: int, group_ids: list) -> list
     Returns:
         list: Admin olunan grup ID'leri
     """
+    # Admin listeleri eşzamanlı alınır, kontroller bellekte yapılır
+    await prefetch_admin_rosters(bot, group_ids)
+
     admin_groups = []
 
     for group_id in group_ids:
@@ -153,18 +304,23 @@ def clear_admin_cache(group_id: int = None, user_id: int = None):
         group_id: Belirli bir grubun cache'ini temizle (None ise hepsini)
         user_id: Belirli bir kullanıcının cache'ini temizle (None ise hepsini)
     """
-    global _admin_cache
-
     if group_id is None and user_id is None:
         _admin_cache.clear()
+        _admin_cache_by_group.clear()
         return
 
-    keys_to_remove = []
+    if group_id is not None:
+        # Grup indeksi sayesinde sadece o grubun kayıtları gezilir
+        users = _admin_cache_by_group.get(group_id, set())
+        user_ids = [user_id] if user_id is not None else list(users)
 
-    for key in _admin_cache:
-        g_id, u_id = key
-        if (group_id is None or g_id == group_id) and (user_id is None or u_id == user_id):
-            keys_to_remove.append(key)
+        for u_id in user_ids:
+            _admin_cache.pop((group_id, u_id), None)
+            _drop_from_group_index(group_id, u_id)
+        return
 
-    for key in keys_to_remove:
-        del _admin_cache[key]
+    # Sadece kullanıcı verilmişse tüm gruplarda ara
+    for g_id in list(_admin_cache_by_group):
+        if user_id in _admin_cache_by_group[g_id]:
+            _admin_cache.pop((g_id, user_id), None)
+            _drop_from_group_index(g_id, user_id)
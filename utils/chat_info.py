@@ -0,0 +1,89 @@
+"""
+💬 Sohbet Bilgisi
+Activity group ve zorunlu kanalların başlık/username/davet linki cache'i
+"""
+
+import time
+from typing import Dict, Tuple
+from telegram import Bot
+from config import CHAT_INFO_CACHE_TTL, ACTIVITY_GROUP_ID
+from database import db
+
+
+# Sohbet bilgisi cache'i: {chat_id: (chat, timestamp)}
+_chat_info_cache: Dict[int, Tuple[object, float]] = {}
+
+
+async def get_chat_info(bot: Bot, chat_id: int):
+    """
+    Sohbet bilgisini getir (cache'den - süre dolduysa Telegram'dan)
+
+    Telegram hatası yukarı iletilir; hata sonucu cache'e yazılmaz.
+
+    Args:
+        bot: Telegram Bot instance
+        chat_id: Sohbet ID
+
+    Returns:
+        Chat: title, username, invite_link alanlarını içeren sohbet bilgisi
+    """
+    now = time.time()
+
+    if chat_id in _chat_info_cache:
+        chat, cached_time = _chat_info_cache[chat_id]
+        if now - cached_time < CHAT_INFO_CACHE_TTL:
+            return chat
+
+    chat = await bot.get_chat(chat_id)
+    _chat_info_cache[chat_id] = (chat, now)
+
+    return chat
+
+
+async def warm_chat_info(bot: Bot) -> int:
+    """
+    Activity group ve aktif Randy'lerin zorunlu kanallarını önceden cache'e al
+
+    Returns:
+        int: Cache'e alınan sohbet sayısı
+    """
+    chat_ids = []
+
+    if ACTIVITY_GROUP_ID and ACTIVITY_GROUP_ID != 0:
+        chat_ids.append(ACTIVITY_GROUP_ID)
+
+    try:
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT DISTINCT rc.channel_id
+                FROM randy_channels rc
+                JOIN randy r ON r.id = rc.randy_id
+                WHERE r.status = 'active'
+            """)
+            chat_ids.extend(row['channel_id'] for row in rows if row['channel_id'] not in chat_ids)
+    except Exception as e:
+        print(f"❌ Zorunlu kanal listesi hatası: {e}")
+
+    warmed = 0
+    for chat_id in chat_ids:
+        try:
+            await get_chat_info(bot, chat_id)
+            warmed += 1
+        except Exception as e:
+            print(f"⚠️ Sohbet bilgisi alınamadı: {chat_id}, {e}")
+
+    return warmed
+
+
+def clear_chat_info(chat_id: int = None):
+    """
+    Sohbet bilgisi cache'ini temizle
+
+    Args:
+        chat_id: Belirli bir sohbetin cache'ini temizle (None ise hepsini)
+    """
+    if chat_id is None:
+        _chat_info_cache.clear()
+        return
+
+    _chat_info_cache.pop(chat_id, None)
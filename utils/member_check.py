@@ -0,0 +1,146 @@
+"""
+👥 Üyelik Kontrolü
+Zorunlu kanal/grup üyeliklerinin eşzamanlı kontrolü ve cache yönetimi
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from telegram import Bot, ChatMember
+from telegram.error import TelegramError
+from config import (
+    CHANNEL_CHECK_CONCURRENCY, CHANNEL_CHECK_TIMEOUT, CHANNEL_CHECK_FAIL_OPEN,
+    MEMBERSHIP_CACHE_MAX_SIZE, MEMBERSHIP_CACHE_POSITIVE_TTL, MEMBERSHIP_CACHE_NEGATIVE_TTL
+)
+
+
+# Aynı anda yapılabilecek get_chat_member çağrısı sınırı (tüm katılımlar için ortak)
+_check_semaphore = asyncio.Semaphore(CHANNEL_CHECK_CONCURRENCY)
+
+# Üyelik cache'i (LRU): {(chat_id, user_id): (is_member, expires_at)}
+_membership_cache: "OrderedDict[Tuple[int, int], Tuple[bool, float]]" = OrderedDict()
+
+
+def get_cached_membership(chat_id: int, user_id: int):
+    """
+    Cache'deki üyelik sonucunu döndür
+
+    Returns:
+        bool | None: Cache'de geçerli sonuç yoksa None
+    """
+    cache_key = (chat_id, user_id)
+    cached = _membership_cache.get(cache_key)
+
+    if cached is None:
+        return None
+
+    is_member, expires_at = cached
+    if time.time() >= expires_at:
+        del _membership_cache[cache_key]
+        return None
+
+    _membership_cache.move_to_end(cache_key)
+    return is_member
+
+
+def set_cached_membership(chat_id: int, user_id: int, is_member: bool):
+    """
+    Üyelik sonucunu cache'e yaz (üye/üye değil için ayrı süre)
+
+    Args:
+        chat_id: Kanal/grup ID
+        user_id: Kullanıcı ID
+        is_member: Üye ise True
+    """
+    ttl = MEMBERSHIP_CACHE_POSITIVE_TTL if is_member else MEMBERSHIP_CACHE_NEGATIVE_TTL
+    cache_key = (chat_id, user_id)
+
+    _membership_cache[cache_key] = (is_member, time.time() + ttl)
+    _membership_cache.move_to_end(cache_key)
+
+    # En uzun süredir kullanılmayanları at
+    while len(_membership_cache) > MEMBERSHIP_CACHE_MAX_SIZE:
+        _membership_cache.popitem(last=False)
+
+
+def clear_membership_cache(chat_id: int = None, user_id: int = None):
+    """
+    Üyelik cache'ini temizle
+
+    Args:
+        chat_id: Belirli bir kanalın cache'ini temizle (None ise hepsini)
+        user_id: Belirli bir kullanıcının cache'ini temizle (None ise hepsini)
+    """
+    if chat_id is None and user_id is None:
+        _membership_cache.clear()
+        return
+
+    keys_to_remove = [
+        key for key in _membership_cache
+        if (chat_id is None or key[0] == chat_id) and (user_id is None or key[1] == user_id)
+    ]
+
+    for key in keys_to_remove:
+        del _membership_cache[key]
+
+
+async def is_chat_member(bot: Bot, chat_id: int, user_id: int) -> bool:
+    """
+    Kullanıcının kanal/grup üyesi olup olmadığını kontrol et
+
+    Sonuç cache'de varsa Telegram'a gidilmez. Kontrol zaman aşımına uğrar
+    veya hata verirse CHANNEL_CHECK_FAIL_OPEN ayarına göre üye sayılır (True)
+    ya da sayılmaz (False); bu sonuç cache'e yazılmaz.
+
+    Args:
+        bot: Telegram Bot instance
+        chat_id: Kanal/grup ID
+        user_id: Kullanıcı ID
+
+    Returns:
+        bool: Üye ise True
+    """
+    cached = get_cached_membership(chat_id, user_id)
+    if cached is not None:
+        return cached
+
+    async with _check_semaphore:
+        try:
+            member = await asyncio.wait_for(
+                bot.get_chat_member(chat_id, user_id),
+                timeout=CHANNEL_CHECK_TIMEOUT
+            )
+            is_member = member.status not in [ChatMember.LEFT, ChatMember.BANNED]
+
+            set_cached_membership(chat_id, user_id, is_member)
+            return is_member
+
+        except asyncio.TimeoutError:
+            print(f"⚠️ Üyelik kontrolü zaman aşımı: Kanal={chat_id}")
+            return CHANNEL_CHECK_FAIL_OPEN
+
+        except TelegramError as e:
+            print(f"⚠️ Üyelik kontrolü hatası: Kanal={chat_id}, {e}")
+            return CHANNEL_CHECK_FAIL_OPEN
+
+
+async def check_memberships(bot: Bot, user_id: int, chat_ids: List[int]) -> Dict[int, bool]:
+    """
+    Kullanıcının birden fazla kanal/gruptaki üyeliğini eşzamanlı kontrol et
+
+    Args:
+        bot: Telegram Bot instance
+        user_id: Kullanıcı ID
+        chat_ids: Kontrol edilecek kanal/grup ID'leri
+
+    Returns:
+        dict: {chat_id: üye mi}
+    """
+    unique_ids = list(dict.fromkeys(chat_ids))
+
+    results = await asyncio.gather(*(
+        is_chat_member(bot, chat_id, user_id) for chat_id in unique_ids
+    ))
+
+    return dict(zip(unique_ids, results))
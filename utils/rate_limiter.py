@@ -0,0 +1,174 @@
+"""
+🚦 Giden İstek Sınırlayıcı
+Telegram'a giden mesajlar için sohbet bazlı ve genel token bucket sınırlayıcı
+- Etkileşimli cevaplar aynı kovayı paylaşan toplu etiketlemenin önüne geçer (öncelik şeritleri)
+- RetryAfter sadece ilgili sohbeti duraklatır
+- Toplu işlere RetryAfter hemen iletilir (kendi hızlarını ayarlarlar)
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Union
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+from config import (
+    RATE_LIMIT_GLOBAL_PER_SECOND, RATE_LIMIT_GROUP_PER_MINUTE,
+    RATE_LIMIT_PRIVATE_PER_SECOND, RATE_LIMIT_MAX_RETRIES
+)
+
+
+# Öncelik şeritleri (rate_limit_args ile verilir, varsayılan: etkileşimli)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+# Sınırlanan uç noktalar (mesaj gönderme/düzenleme); silme ve diğer çağrılar doğrudan geçer
+_LIMITED_PREFIXES = ("send", "edit", "copy", "forward")
+
+
+class _TokenBucket:
+    """Basit token bucket (saniyede rate token, en fazla capacity)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float, need: float = 1) -> float:
+        """need kadar token için beklenecek süre (saniye)"""
+        self._refill(now)
+        if self.tokens >= need:
+            return 0.0
+        return (need - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class OutboundRateLimiter(BaseRateLimiter[int]):
+    """
+    Sohbet bazlı + genel token bucket sınırlayıcı
+
+    Application.builder().rate_limiter(...) ile bağlanır; bot üzerinden yapılan
+    tüm çağrılar buradan geçer. Toplu işler rate_limit_args=PRIORITY_BULK verir.
+    """
+
+    def __init__(self):
+        self._global = _TokenBucket(RATE_LIMIT_GLOBAL_PER_SECOND, RATE_LIMIT_GLOBAL_PER_SECOND)
+        self._chats: Dict[Any, _TokenBucket] = {}
+        self._paused_until: Dict[Any, float] = {}
+        self._interactive_waiting: Dict[Any, int] = {}
+        self._interactive_total = 0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def _chat_bucket(self, chat_id) -> _TokenBucket:
+        bucket = self._chats.get(chat_id)
+
+        if bucket is None:
+            # Negatif ID'ler (veya @username) grup/kanal, pozitifler özel sohbet
+            if isinstance(chat_id, int) and chat_id > 0:
+                bucket = _TokenBucket(RATE_LIMIT_PRIVATE_PER_SECOND, 3)
+            else:
+                bucket = _TokenBucket(RATE_LIMIT_GROUP_PER_MINUTE / 60, 3)
+            self._chats[chat_id] = bucket
+
+            # Uzun süredir boşta olan (dolu) sohbet kovalarını at
+            if len(self._chats) > 10000:
+                now = time.monotonic()
+                for key in [k for k, b in self._chats.items() if b.wait_time(now) == 0 and b.tokens >= b.capacity]:
+                    if self._paused_until.get(key, 0) <= now:
+                        self._chats.pop(key, None)
+                        self._paused_until.pop(key, None)
+
+        return bucket
+
+    async def _acquire(self, chat_id, priority: int):
+        """Sohbet ve genel sınır uygun olana kadar bekle"""
+        interactive = priority == PRIORITY_INTERACTIVE
+        if interactive:
+            self._interactive_waiting[chat_id] = self._interactive_waiting.get(chat_id, 0) + 1
+            self._interactive_total += 1
+
+        try:
+            while True:
+                now = time.monotonic()
+                chat_bucket = self._chat_bucket(chat_id) if chat_id is not None else None
+
+                # Toplu istek, başka sohbette bekleyen etkileşimli istek varsa
+                # genel kovada onlara bir token bırakır
+                need = 1
+                if not interactive and self._interactive_total > self._interactive_waiting.get(chat_id, 0):
+                    need = min(2, self._global.capacity)
+
+                wait = self._global.wait_time(now, need)
+                if chat_bucket is not None:
+                    wait = max(wait, chat_bucket.wait_time(now))
+                    wait = max(wait, self._paused_until.get(chat_id, 0) - now)
+
+                # Aynı sohbette bekleyen etkileşimli istek varken toplu istek sıra vermez
+                if not interactive and self._interactive_waiting.get(chat_id, 0) > 0:
+                    wait = max(wait, 0.05)
+
+                if wait <= 0:
+                    self._global.take()
+                    if chat_bucket is not None:
+                        chat_bucket.take()
+                    return
+
+                await asyncio.sleep(wait)
+        finally:
+            if interactive:
+                self._interactive_total -= 1
+                self._interactive_waiting[chat_id] -= 1
+                if self._interactive_waiting[chat_id] == 0:
+                    del self._interactive_waiting[chat_id]
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Union[bool, Dict[str, Any], List[Dict[str, Any]]]]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[int],
+    ) -> Union[bool, Dict[str, Any], List[Dict[str, Any]]]:
+        if not endpoint.startswith(_LIMITED_PREFIXES):
+            return await callback(*args, **kwargs)
+
+        chat_id = data.get("chat_id")
+        priority = PRIORITY_INTERACTIVE if rate_limit_args is None else rate_limit_args
+
+        retries = 0
+        while True:
+            await self._acquire(chat_id, priority)
+
+            try:
+                return await callback(*args, **kwargs)
+
+            except RetryAfter as e:
+                # Sadece bu sohbeti duraklat, diğer sohbetler devam eder
+                retry_after = float(e.retry_after)
+                if chat_id is not None:
+                    self._paused_until[chat_id] = time.monotonic() + retry_after
+
+                # Toplu işler flood sinyalini kendileri değerlendirir (etiketleme hızı)
+                if priority == PRIORITY_BULK:
+                    raise
+
+                retries += 1
+                if retries > RATE_LIMIT_MAX_RETRIES:
+                    raise
+
+                print(f"⏳ Flood control: Sohbet={chat_id}, {retry_after} saniye bekleniyor...")
+
+                if chat_id is None:
+                    await asyncio.sleep(retry_after)
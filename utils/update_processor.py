@@ -0,0 +1,72 @@
+"""
+🔀 Güncelleme İşleyici
+Güncellemeleri eşzamanlı işler, aynı sohbetteki aynı kullanıcının güncellemelerini sırayla
+- Bir sohbette giden mesaj sınırına takılan handler diğer sohbetleri bekletmez
+- Aynı kullanıcının aynı sohbetteki güncellemeleri (özel menü adımları, komutlar) geliş sırasıyla işlenir
+- Sırasını bekleyen güncelleme işlem yuvası tutmaz
+"""
+
+from collections import deque
+from typing import Any, Awaitable, Deque, Dict, Optional, Tuple
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+class UserOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    (sohbet, kullanıcı) bazlı sıralı, farklı anahtarlar arası eşzamanlı güncelleme işleyici
+
+    Application.builder().concurrent_updates(...) ile bağlanır. Bir anahtar için
+    çalışan güncelleme varsa yenisi kuyruğa eklenir ve yuvasını hemen bırakır;
+    kuyruğu o anahtarın çalışan güncellemesi kendi yuvasında sırayla boşaltır.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        self._queues: Dict[Tuple[Optional[int], Optional[int]], Deque[Awaitable[Any]]] = {}
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    @staticmethod
+    def _order_key(update: object) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """Güncellemenin sıralama anahtarı: (sohbet, kullanıcı)"""
+        if not isinstance(update, Update):
+            return None
+
+        chat_id = update.effective_chat.id if update.effective_chat else None
+        user_id = update.effective_user.id if update.effective_user else None
+        if chat_id is None and user_id is None:
+            return None
+        return (chat_id, user_id)
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self._order_key(update)
+
+        if key is None:
+            await coroutine
+            return
+
+        queue = self._queues.get(key)
+        if queue is not None:
+            # Bu anahtar için çalışan var, sıraya ekle ve yuvayı bırak
+            queue.append(coroutine)
+            return
+
+        queue = deque()
+        self._queues[key] = queue
+        queue.append(coroutine)
+        try:
+            while queue:
+                try:
+                    await queue.popleft()
+                except Exception as e:
+                    print(f"❌ Sıralı güncelleme işleme hatası: {e}")
+        finally:
+            # İptal edildiysek bekleyenleri kapat (hiç beklenmemiş coroutine uyarısı olmasın)
+            self._queues.pop(key, None)
+            while queue:
+                queue.popleft().close()